@@ -0,0 +1,153 @@
+"""Compare in-thread page parsing with the process pool.
+
+Parses a fleet of stand-in detail pages once in the calling thread and once
+through ``ParsePool`` at several batch sizes. Every run shares the process
+with a busy Python thread standing in for the rest of Home Assistant or the
+poller, and reports both the parse wall time and how much of its solo speed
+that thread kept. Full pages and small UpdatePanel fragments are both
+measured, since the inter-process overhead weighs very differently on each.
+The daemon only sends full pages to the pool, gathered from several
+accounts per call so that the batches stay full.
+
+The pool can only win with spare CPU cores; on a single core the workers
+compete with the process for the same CPU.
+
+    python benchmarks/bench_parse.py --fleets 25 100 400 --workers 2
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import standin  # noqa: E402
+
+from custom_components.postown_smartweb.const import (  # noqa: E402
+    DEVICE_TYPE_HEATER,
+    DEVICE_TYPE_LIGHT,
+)
+from custom_components.postown_smartweb.parse_pool import (  # noqa: E402
+    ParsePool,
+    parse_batch,
+)
+
+
+def build_jobs(count: int, full: bool) -> list[tuple[str, bytes, str]]:
+    """Render a fleet of alternating light and heater pages."""
+    state = standin.StandInState()
+    jobs = []
+    for index in range(count):
+        device_id = str(index)
+        if index % 2:
+            device_type, panel = DEVICE_TYPE_LIGHT, state.light_panel(device_id)
+        else:
+            device_type, panel = DEVICE_TYPE_HEATER, state.heater_panel(device_id)
+        body = standin.page(f'<div id="UpdatePanel1">{panel}</div>') if full else panel
+        jobs.append((device_type, body.encode("utf-8"), "utf-8"))
+    return jobs
+
+
+class Competitor:
+    """Thread doing pure Python work, counting how much it gets done."""
+
+    def __init__(self) -> None:
+        """Initialize the competitor."""
+        self.steps = 0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        """Spin in small units of work until stopped."""
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            sum(range(1000))
+            self.steps += 1
+        self.elapsed = time.perf_counter() - start
+
+    @property
+    def rate(self) -> float:
+        """Return the work done per second."""
+        return self.steps / self.elapsed
+
+    def __enter__(self) -> Competitor:
+        """Start the competitor."""
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        """Stop the competitor."""
+        self._stop.set()
+        self._thread.join()
+
+
+def solo_rate() -> float:
+    """Return the competitor's speed with nothing else running."""
+    with Competitor() as competitor:
+        time.sleep(0.5)
+    return competitor.rate
+
+
+def measure(parse, jobs, rounds: int) -> tuple[float, float, list]:
+    """Return the best wall time, the competitor's speed and the results."""
+    best = float("inf")
+    rates = []
+    results = None
+    for _ in range(rounds):
+        with Competitor() as competitor:
+            start = time.perf_counter()
+            results = parse(jobs)
+            best = min(best, time.perf_counter() - start)
+        rates.append(competitor.rate)
+    return best, sum(rates) / len(rates), results
+
+
+def main() -> None:
+    """Run the comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fleets", type=int, nargs="+", default=[25, 100, 400])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.workers} parse workers, best of {args.rounds}")
+    pools = {size: ParsePool(args.workers, size) for size in args.batch_sizes}
+    start = time.perf_counter()
+    for pool in pools.values():
+        pool.start()
+    print(f"pool start-up: {(time.perf_counter() - start) / len(pools) * 1000:.0f} ms per pool")
+    solo = solo_rate()
+
+    for full in (True, False):
+        print("full pages" if full else "UpdatePanel fragments")
+        for count in args.fleets:
+            jobs = build_jobs(count, full)
+            size = sum(len(job[1]) for job in jobs) / 1024
+            print(f"  {count} pages, {size:.0f} KiB")
+            baseline, rate, expected = measure(parse_batch, jobs, args.rounds)
+            print(
+                f"    {'in-thread':16s} {baseline * 1000:8.1f} ms"
+                f"  other thread at {rate / solo:4.0%}"
+            )
+            for batch_size, pool in pools.items():
+                elapsed, rate, results = measure(pool.parse, jobs, args.rounds)
+                if results != expected:
+                    raise RuntimeError("Pool results differ from in-thread parsing")
+                print(
+                    f"    {f'pool, batch {batch_size}':16s} {elapsed * 1000:8.1f} ms"
+                    f"  other thread at {rate / solo:4.0%}"
+                    f"  {baseline / elapsed:5.2f}x"
+                )
+
+    for pool in pools.values():
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Compare full page polling with UpdatePanel delta polling.
+
+Polls the same devices against the local stand-in server with each poll
+mode and reports bytes uploaded, downloaded and in total, and latency per
+poll. Uploads matter here: every delta poll posts the whole viewstate back. A third run points
+``auto`` mode at a server without partial rendering to show the fallback.
+
+    python benchmarks/bench_polling.py --devices 10 --rounds 20 --latency 0.02
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import standin  # noqa: E402
+
+from custom_components.postown_smartweb.const import (  # noqa: E402
+    POLL_MODE_AUTO,
+    POLL_MODE_DELTA,
+    POLL_MODE_FULL,
+)
+from custom_components.postown_smartweb.hub import SmartWebHub  # noqa: E402
+
+
+def run(
+    poll_mode: str, devices: int, rounds: int, latency: float, partial_rendering: bool
+) -> None:
+    """Poll every device for a number of rounds and print the statistics."""
+    server, state = standin.serve(latency=latency, partial_rendering=partial_rendering)
+    host = f"http://127.0.0.1:{server.server_port}"
+    hub = SmartWebHub(host, standin.USERNAME, standin.PASSWORD, poll_mode=poll_mode)
+    targets = [
+        ("light" if index % 2 else "heater", str(index)) for index in range(devices)
+    ]
+
+    # The first round loads every page in full in any mode; leave it out.
+    for device_type, device_id in targets:
+        hub.poll_device(device_type, device_id)
+    before_sent = state.bytes_sent
+    before_received = state.bytes_received
+    before_requests = state.request_count
+
+    latencies = []
+    for _ in range(rounds):
+        for device_type, device_id in targets:
+            start = time.perf_counter()
+            if hub.poll_device(device_type, device_id) is None:
+                raise RuntimeError(f"Poll of {device_type} {device_id} failed")
+            latencies.append(time.perf_counter() - start)
+
+    polls = len(latencies)
+    latencies.sort()
+    label = poll_mode if partial_rendering else f"{poll_mode} (no partial rendering)"
+    upload = (state.bytes_received - before_received) / polls / 1024
+    download = (state.bytes_sent - before_sent) / polls / 1024
+    print(
+        f"  {label:34s}"
+        f" up {upload:5.1f} down {download:5.1f} total {upload + download:5.1f} KiB/poll"
+        f" {(state.request_count - before_requests) / polls:5.2f} req/poll"
+        f" p50 {latencies[polls // 2] * 1000:6.1f} ms"
+        f" p95 {latencies[int(polls * 0.95)] * 1000:6.1f} ms"
+    )
+    hub.close()
+    server.shutdown()
+
+
+def main() -> None:
+    """Run the comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    print(
+        f"{args.devices} devices x {args.rounds} rounds, "
+        f"{args.latency * 1000:.0f} ms server latency"
+    )
+    run(POLL_MODE_FULL, args.devices, args.rounds, args.latency, True)
+    run(POLL_MODE_DELTA, args.devices, args.rounds, args.latency, True)
+    run(POLL_MODE_AUTO, args.devices, args.rounds, args.latency, False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Startup-time benchmark for the Postown SmartWeb integration.
+
+Measures two things:
+
+* Import time of the integration modules in a fresh interpreter, and
+  whether importing them pulls in ``requests`` and ``bs4``.
+* Time until ``async_setup_entry`` returns, and until every entity's cache
+  key holds its first state through ``poll_device``, against the local
+  stand-in server. Home Assistant is not required: the setup is reproduced
+  with an asyncio loop and an executor the same way the integration drives
+  it, once with the previous eager login and once with the deferred login.
+
+    python benchmarks/bench_startup.py --devices 10 --latency 0.05
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import standin  # noqa: E402
+
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, "requests" in sys.modules, "bs4" in sys.modules)
+"""
+
+
+def measure_import(module: str, runs: int) -> tuple[float, bool, bool] | None:
+    """Return the best import time of a module in a fresh interpreter."""
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET.format(module=module)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if proc.returncode != 0:
+            return None
+        elapsed, has_requests, has_bs4 = proc.stdout.split()
+        result = (float(elapsed), has_requests == "True", has_bs4 == "True")
+        if best is None or result[0] < best[0]:
+            best = result
+    return best
+
+
+async def _setup(
+    host: str, devices: list[tuple[str, str]], eager: bool
+) -> tuple[float, float]:
+    """Reproduce setup and the first entity refreshes.
+
+    Returns the seconds until ``async_setup_entry`` would return and until
+    every entity's cache key holds a state.
+    """
+    from custom_components.postown_smartweb.hub import SmartWebHub
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=len(devices) + 1)
+    start = time.perf_counter()
+
+    # async_setup_entry builds the hub in the executor. The previous version
+    # then logged in before returning; now the first login runs in a
+    # background task once the platforms are set up.
+    hub = await loop.run_in_executor(
+        executor, SmartWebHub, host, standin.USERNAME, standin.PASSWORD
+    )
+    if eager and not await loop.run_in_executor(executor, hub.test_connection):
+        raise RuntimeError("Login against the stand-in failed")
+    setup = time.perf_counter() - start
+
+    background = []
+    if not eager:
+        background.append(loop.run_in_executor(executor, hub.ensure_login))
+    # Each entity's first update finds an empty cache and starts a
+    # background refresh through poll_device.
+    background.extend(
+        loop.run_in_executor(executor, hub.poll_device, *key) for key in devices
+    )
+    await asyncio.gather(*background)
+    ready = time.perf_counter() - start
+
+    if any(hub.cache.get(key) is None for key in devices):
+        raise RuntimeError("A device state could not be fetched")
+    hub.close()
+    executor.shutdown()
+    return setup, ready
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print("Import time (best of %d, fresh interpreter)" % args.runs)
+    for module in (
+        "custom_components.postown_smartweb.hub",
+        "custom_components.postown_smartweb.config_flow",
+        "requests, bs4",
+    ):
+        result = measure_import(module, args.runs)
+        if result is None:
+            print(f"  {module:50s} unavailable")
+            continue
+        elapsed, has_requests, has_bs4 = result
+        print(
+            f"  {module:50s} {elapsed * 1000:7.1f} ms"
+            f"  requests={'loaded' if has_requests else 'deferred'}"
+            f"  bs4={'loaded' if has_bs4 else 'deferred'}"
+        )
+
+    server, state = standin.serve(latency=args.latency)
+    host = f"http://127.0.0.1:{server.server_port}"
+    devices = [
+        ("light" if index % 2 else "heater", str(index)) for index in range(args.devices)
+    ]
+
+    print(
+        f"\nSetup and entities ready ({args.devices} devices, "
+        f"{args.latency * 1000:.0f} ms server latency, best of {args.runs})"
+    )
+    for label, eager in (("eager login", True), ("deferred login", False)):
+        before = state.request_count
+        timings = [asyncio.run(_setup(host, devices, eager)) for _ in range(args.runs)]
+        requests_per_run = (state.request_count - before) / args.runs
+        print(
+            f"  {label:15s} setup returns {min(t[0] for t in timings) * 1000:7.1f} ms"
+            f"  entities ready {min(t[1] for t in timings) * 1000:7.1f} ms"
+            f"  ({requests_per_run:.0f} requests per run)"
+        )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Record a SmartWeb session to a cassette or replay one offline.
+
+Record a real session (credentials are redacted in the cassette):
+
+    python benchmarks/replay.py record http://sdexpo9.postown.net ID PW \
+        --device light:1 --device heater:31 --polls 3 --out trace.json
+
+Replay it through the hub and report request counts and latency:
+
+    python benchmarks/replay.py replay trace.json --device light:1 \
+        --device heater:31 --polls 3 --time-scale 1.0
+
+``--hedge-reads`` turns on hedged page reads for either command, and the
+report then counts how many reads were hedged and how many the hedge won.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.postown_smartweb.hub import SmartWebHub  # noqa: E402
+from custom_components.postown_smartweb.transport import (  # noqa: E402
+    RecordingTransport,
+    ReplayTransport,
+    RequestsTransport,
+)
+
+REPLAY_HOST = "http://replay.invalid"
+
+def _devices(specs: list[str]) -> list[tuple[str, str]]:
+    """Split ``type:id`` device specs."""
+    devices = []
+    for spec in specs:
+        device_type, _, device_id = spec.partition(":")
+        devices.append((device_type, device_id))
+    return devices
+
+
+def _run(hub: SmartWebHub, devices: list[tuple[str, str]], polls: int) -> list[float]:
+    """Poll every device the way the integration does, returning latencies.
+
+    The hub logs in on the first poll, and polls after the first page load
+    go through UpdatePanel postbacks where the server supports them.
+    """
+    latencies = []
+    for _ in range(polls):
+        for device_type, device_id in devices:
+            start = time.monotonic()
+            hub.poll_device(device_type, device_id)
+            latencies.append(time.monotonic() - start)
+    return latencies
+
+
+def _report(hub: SmartWebHub, latencies: list[float]) -> None:
+    """Print request counts and poll latency."""
+    stats = hub.transport.stats()
+    latencies.sort()
+    print(f"requests:      {stats['requests']}")
+    print(f"request time:  {stats['total_elapsed'] * 1000:.1f} ms total, "
+          f"{stats['mean_elapsed'] * 1000:.1f} ms mean")
+    for mode, poll in hub.poll_stats.items():
+        print(f"{mode + ' polls:':14s} {poll['count']}, {poll['bytes'] / 1024:.1f} KiB")
+    if latencies:
+        print(f"poll p50:      {latencies[len(latencies) // 2] * 1000:.1f} ms")
+        print(f"poll max:      {latencies[-1] * 1000:.1f} ms")
+    print(f"hedged reads:  {hub.hedged_reads}, {hub.hedge_wins} won by the hedge")
+
+
+def main() -> None:
+    """Run the record or replay command."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("record")
+    record.add_argument("host")
+    record.add_argument("username")
+    record.add_argument("password")
+    record.add_argument("--out", required=True)
+
+    replay = sub.add_parser("replay")
+    replay.add_argument("cassette")
+    replay.add_argument("--time-scale", type=float, default=1.0)
+
+    for command in (record, replay):
+        command.add_argument("--device", action="append", default=[])
+        command.add_argument("--polls", type=int, default=1)
+        command.add_argument("--hedge-reads", action="store_true")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "record":
+        transport = RecordingTransport(RequestsTransport())
+        hub = SmartWebHub(
+            args.host, args.username, args.password, transport, args.hedge_reads
+        )
+        latencies = _run(hub, _devices(args.device), args.polls)
+        transport.save(args.out)
+    else:
+        transport = ReplayTransport(args.cassette, args.time_scale)
+        hub = SmartWebHub(REPLAY_HOST, "replay", "replay", transport, args.hedge_reads)
+        latencies = _run(hub, _devices(args.device), args.polls)
+
+    _report(hub, latencies)
+    hub.close()
+
+
+if __name__ == "__main__":
+    main()
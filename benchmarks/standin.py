@@ -0,0 +1,323 @@
+"""Local stand-in for a Postown SmartWeb server.
+
+Implements just enough of the ASP.NET site for the hub to work against it:
+the three-request login chain, cookie sessions with an idle timeout, and the
+light and heater detail pages with their UpdatePanel postbacks. Pages are
+padded to roughly the size of the real ones.
+
+    python benchmarks/standin.py --port 8080 --latency 0.05
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+USERNAME = "demo"
+PASSWORD = "demo"
+
+LOGIN_PATH = "/SmartWeb/Default.aspx"
+SERVICE_PATH = "/SmartWeb/_WebService/WizWeb_Svc.asmx/Login"
+MAIN_PATH = "/SmartWeb/My_Home/Main.aspx"
+LIGHT_PATH = "/SmartWeb/My_Home/Detail_Control_Light.aspx"
+HEATER_PATH = "/SmartWeb/My_Home/Detail_Control_Heater.aspx"
+
+# The real pages ship large inline scripts and a sizeable viewstate.
+SCRIPT_PADDING = "<script>" + "var _sw=0;" * 2000 + "</script>"
+VIEWSTATE = "/wEPDw" + "A" * 6000
+
+
+def delta(*entries: tuple[str, str, str]) -> str:
+    """Encode entries in the ASP.NET partial rendering format."""
+    return "".join(
+        f"{len(content)}|{kind}|{ident}|{content}|" for kind, ident, content in entries
+    )
+
+
+def hidden_fields() -> str:
+    """Render the ASP.NET hidden form fields."""
+    return (
+        f'<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="{VIEWSTATE}" />'
+        '<input type="hidden" name="__VIEWSTATEGENERATOR" id="__VIEWSTATEGENERATOR" value="CA0B0334" />'
+        '<input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" value="/wEdAAVal" />'
+    )
+
+
+class StandInState:
+    """Device and session state shared by all request handlers."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        session_idle_timeout: float = 1200.0,
+        partial_rendering: bool = True,
+    ) -> None:
+        """Initialize the state."""
+        self.latency = latency
+        self.session_idle_timeout = session_idle_timeout
+        self.partial_rendering = partial_rendering
+        self.lock = threading.Lock()
+        self.tokens: set[str] = set()
+        self.sessions: dict[str, float] = {}
+        self.lights: dict[str, bool] = {}
+        self.heaters: dict[str, dict] = {}
+        self.request_count = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def light(self, device_no: str) -> bool:
+        """Return the light state, creating it on first use."""
+        return self.lights.setdefault(device_no, False)
+
+    def heater(self, device_no: str) -> dict:
+        """Return the heater state, creating it on first use."""
+        return self.heaters.setdefault(device_no, {"mode": "off", "temp": 20})
+
+    def touch(self, session_id: str | None) -> bool:
+        """Return whether the session is valid, extending it if so."""
+        now = time.monotonic()
+        with self.lock:
+            last = self.sessions.get(session_id or "")
+            if last is None or now - last > self.session_idle_timeout:
+                self.sessions.pop(session_id or "", None)
+                return False
+            self.sessions[session_id] = now
+            return True
+
+    def light_panel(self, device_no: str) -> str:
+        """Render the UpdatePanel content of a light page."""
+        icon = "icon_b_light_on" if self.light(device_no) else "icon_b_light_off"
+        return (
+            f'<img id="imgState" src="../images/{icon}.png" />'
+            '<input type="image" name="btnOn" id="btnOn" src="../images/btn_on.png" />'
+            '<input type="image" name="btnOff" id="btnOff" src="../images/btn_off.png" />'
+        )
+
+    def heater_panel(self, device_no: str) -> str:
+        """Render the UpdatePanel content of a heater page."""
+        heater = self.heater(device_no)
+        icon = {
+            "on": "icon_b_boiler_on",
+            "away": "icon_b_boiler_away",
+            "off": "icon_b_boiler_off",
+        }[heater["mode"]]
+        return (
+            f'<img id="imgState" src="../images/{icon}.png" />'
+            f'<input name="txtboxSetTemp" type="text" value="{heater["temp"]}" id="txtboxSetTemp" />'
+            '<input type="image" name="btnOn" id="btnOn" src="../images/btn_on.png" />'
+            '<input type="image" name="btnOff" id="btnOff" src="../images/btn_off.png" />'
+            '<input type="image" name="btnAway" id="btnAway" src="../images/btn_away.png" />'
+            '<input type="image" name="btnTmpSet" id="btnTmpSet" src="../images/btn_set.png" />'
+        )
+
+
+def page(body: str) -> str:
+    """Wrap content in a full page."""
+    return (
+        "<!DOCTYPE html><html><head><title>SmartWeb</title>"
+        f"{SCRIPT_PADDING}</head><body><form method=\"post\" id=\"form1\">"
+        f"{hidden_fields()}{body}</form></body></html>"
+    )
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Request handler for the stand-in server."""
+
+    server_version = "Microsoft-IIS/8.5"
+    state: StandInState
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        """Silence per-request logging."""
+
+    def _session_id(self) -> str | None:
+        """Return the session cookie of the request."""
+        for part in self.headers.get("Cookie", "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "ASP.NET_SessionId":
+                return value
+        return None
+
+    def _send(
+        self,
+        status: int,
+        body: str = "",
+        content_type: str = "text/html; charset=utf-8",
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        """Send a response after the configured latency."""
+        if self.state.latency:
+            time.sleep(self.state.latency)
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        with self.state.lock:
+            self.state.request_count += 1
+            self.state.bytes_sent += len(data)
+
+    def _redirect_to_login(self) -> None:
+        """Redirect an unauthenticated request to the login page."""
+        self._send(302, headers={"Location": LOGIN_PATH})
+
+    def _read_body(self) -> str:
+        """Read the request body."""
+        length = int(self.headers.get("Content-Length") or 0)
+        with self.state.lock:
+            self.state.bytes_received += length
+        return self.rfile.read(length).decode("utf-8")
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Serve login and detail pages."""
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if url.path == LOGIN_PATH:
+            self._send(200, page(
+                '<div id="UpdatePanel1"><input name="txtID" id="txtID" />'
+                '<input name="txtPW" id="txtPW" type="password" /></div>'
+            ))
+            return
+
+        if not self.state.touch(self._session_id()):
+            self._redirect_to_login()
+            return
+
+        device_no = query.get("device_no", "")
+        if url.path == LIGHT_PATH:
+            panel = self.state.light_panel(device_no)
+        elif url.path == HEATER_PATH:
+            panel = self.state.heater_panel(device_no)
+        elif url.path == MAIN_PATH:
+            panel = ""
+        else:
+            self._send(404)
+            return
+        self._send(200, page(f'<div id="UpdatePanel1">{panel}</div>'))
+
+    def do_POST(self) -> None:  # noqa: N802
+        """Handle the login service and postbacks."""
+        url = urlsplit(self.path)
+        body = self._read_body()
+
+        if url.path == SERVICE_PATH:
+            credentials = json.loads(body or "{}")
+            if credentials.get("ID") == USERNAME and credentials.get("PW") == PASSWORD:
+                token = secrets.token_hex(8)
+                with self.state.lock:
+                    self.state.tokens.add(token)
+            else:
+                token = "<span>로그인 정보가 올바르지 않습니다</span>"
+            self._send(200, json.dumps({"d": token}), "application/json; charset=utf-8")
+            return
+
+        form = {key: values[0] for key, values in parse_qs(body, keep_blank_values=True).items()}
+
+        if url.path == LOGIN_PATH:
+            with self.state.lock:
+                valid = form.get("Hidden1") in self.state.tokens
+                self.state.tokens.discard(form.get("Hidden1"))
+                session_id = secrets.token_hex(12)
+                if valid:
+                    self.state.sessions[session_id] = time.monotonic()
+            if not valid:
+                self._send(200, delta(("updatePanel", "UpdatePanel1", "")))
+                return
+            self._send(
+                200,
+                delta(("pageRedirect", "", "%2fSmartWeb%2fMy_Home%2fMain.aspx")),
+                headers={"Set-Cookie": f"ASP.NET_SessionId={session_id}; path=/; HttpOnly"},
+            )
+            return
+
+        if not self.state.touch(self._session_id()):
+            self._redirect_to_login()
+            return
+
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        device_no = query.get("device_no", "")
+        _, _, target = form.get("ScriptManager1", "").partition("|")
+
+        if target == "UpdatePanel1" and not self.state.partial_rendering:
+            # Like a page without ScriptManager support: a plain full render.
+            self.do_GET()
+            return
+
+        with self.state.lock:
+            if url.path == LIGHT_PATH:
+                if target in ("btnOn", "btnOff"):
+                    self.state.lights[device_no] = target == "btnOn"
+                panel = self.state.light_panel(device_no)
+            elif url.path == HEATER_PATH:
+                heater = self.state.heater(device_no)
+                if target == "btnOn":
+                    heater["mode"] = "on"
+                elif target == "btnOff":
+                    heater["mode"] = "off"
+                elif target == "btnAway":
+                    heater["mode"] = "away"
+                elif target == "btnTmpSet":
+                    heater["temp"] = int(form.get("txtboxSetTemp", heater["temp"]))
+                panel = self.state.heater_panel(device_no)
+            else:
+                self._send(404)
+                return
+
+        self._send(200, delta(
+            ("updatePanel", "UpdatePanel1", panel),
+            ("hiddenField", "__VIEWSTATE", VIEWSTATE),
+            ("hiddenField", "__EVENTVALIDATION", "/wEdAAVal"),
+        ))
+
+
+def serve(
+    port: int = 0,
+    latency: float = 0.0,
+    session_idle_timeout: float = 1200.0,
+    partial_rendering: bool = True,
+) -> tuple[ThreadingHTTPServer, StandInState]:
+    """Start the stand-in server in a background thread."""
+    state = StandInState(latency, session_idle_timeout, partial_rendering)
+    handler = type("BoundStandInHandler", (StandInHandler,), {"state": state})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main() -> None:
+    """Run the stand-in server in the foreground."""
+    parser = argparse.ArgumentParser(description="Local SmartWeb stand-in server")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--session-idle-timeout", type=float, default=1200.0)
+    parser.add_argument(
+        "--no-partial-rendering",
+        action="store_true",
+        help="answer panel refresh postbacks with full pages",
+    )
+    args = parser.parse_args()
+
+    server, _ = serve(
+        args.port,
+        args.latency,
+        args.session_idle_timeout,
+        not args.no_partial_rendering,
+    )
+    print(f"SmartWeb stand-in listening on http://127.0.0.1:{server.server_port}")
+    print(f"Credentials: {USERNAME} / {PASSWORD}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,40 +2,95 @@
 from __future__ import annotations
 
 import logging
+from datetime import timedelta
+from typing import TYPE_CHECKING
 
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME, Platform
-from homeassistant.core import HomeAssistant
+from .const import (
+    DOMAIN,
+    CONF_DEVICES,
+    KEEPALIVE_INTERVAL,
+    OUTBOX_STORAGE_VERSION,
+)
 
-from .const import DOMAIN, CONF_DEVICES
-from .hub import SmartWebHub
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.SWITCH, Platform.CLIMATE, Platform.SENSOR]
+# Plain strings keep this module free of Home Assistant imports, so the hub
+# and parsing modules can be imported (and timed) on their own.
+PLATFORMS: list[str] = ["switch", "climate", "sensor"]
+
+
+def _outbox_key(entry: ConfigEntry) -> str:
+    """Return the storage key of an entry's command outbox."""
+    return f"{DOMAIN}.{entry.entry_id}.outbox"
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Postown SmartWeb from a config entry."""
-    hub = SmartWebHub(
+    from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME
+    from homeassistant.helpers.event import async_track_time_interval
+    from homeassistant.helpers.storage import Store
+
+    from .hub import SmartWebHub
+    from .outbox import OutboxRunner
+
+    # Creating the transport imports requests, so keep it off the event loop.
+    # Login is deferred to the first poll, letting the platforms load
+    # without waiting on the server.
+    hub = await hass.async_add_executor_job(
+        SmartWebHub,
         entry.data[CONF_HOST],
         entry.data[CONF_USERNAME],
         entry.data[CONF_PASSWORD],
     )
 
-    result = await hass.async_add_executor_job(hub.test_connection)
-    if not result:
-        _LOGGER.error("Failed to connect to Postown SmartWeb")
-        return False
+    # Commands queued while the server was unreachable survive restarts.
+    outbox = OutboxRunner(hass, hub, Store(hass, OUTBOX_STORAGE_VERSION, _outbox_key(entry)))
+    await outbox.async_load()
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
         "hub": hub,
+        "outbox": outbox,
         "devices": entry.data.get(CONF_DEVICES, []),
     }
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    outbox.async_start()
+
+    async def _async_first_login() -> None:
+        """Check the credentials and connection without holding up setup."""
+        if await hass.async_add_executor_job(hub.ensure_login):
+            return
+        if hub.auth_failed:
+            _LOGGER.error(
+                "%s rejected the username or password, starting re-authentication",
+                hub.host,
+            )
+            entry.async_start_reauth(hass)
+        else:
+            _LOGGER.error(
+                "Could not log in to %s; devices stay unavailable until the "
+                "server can be reached",
+                hub.host,
+            )
+
+    entry.async_create_background_task(
+        hass, _async_first_login(), "postown_smartweb first login"
+    )
+
+    async def _async_keepalive(_now) -> None:
+        """Refresh the session in the background before it expires."""
+        await hass.async_add_executor_job(hub.keepalive)
 
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass, _async_keepalive, timedelta(seconds=KEEPALIVE_INTERVAL)
+        )
+    )
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
@@ -46,11 +101,20 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data = hass.data[DOMAIN].pop(entry.entry_id)
+        await data["outbox"].async_stop()
+        await hass.async_add_executor_job(data["hub"].close)
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored outbox of a deleted config entry."""
+    from homeassistant.helpers.storage import Store
+
+    await Store(hass, OUTBOX_STORAGE_VERSION, _outbox_key(entry)).async_remove()
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
     await async_unload_entry(hass, entry)
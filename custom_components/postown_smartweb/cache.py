@@ -0,0 +1,91 @@
+"""Stale-while-revalidate device state cache for the Postown SmartWeb hub."""
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+DeviceKey = tuple[str, str]
+
+
+class CachedState:
+    """A device state and when it was fetched."""
+
+    __slots__ = ("state", "updated")
+
+    def __init__(self, state: dict[str, Any], updated: float) -> None:
+        """Initialize the entry."""
+        self.state = state
+        self.updated = updated
+
+    @property
+    def age(self) -> float:
+        """Return the age of the state in seconds."""
+        return time.monotonic() - self.updated
+
+
+class StateCache:
+    """Device states keyed by ``(device_type, device_id)``.
+
+    Readers never wait on the network: they get whatever is cached and
+    start at most one background refresh per device once the state is older
+    than the soft TTL. Listeners are called whenever a device state is
+    stored, from whichever thread stored it.
+    """
+
+    def __init__(self, soft_ttl: float, hard_ttl: float) -> None:
+        """Initialize the cache."""
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self._lock = threading.Lock()
+        self._entries: dict[DeviceKey, CachedState] = {}
+        self._refreshing: set[DeviceKey] = set()
+        self._listeners: dict[DeviceKey, list[Callable[[], None]]] = {}
+
+    def get(self, key: DeviceKey) -> CachedState | None:
+        """Return the cached state of a device."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key: DeviceKey, state: dict[str, Any]) -> None:
+        """Store a device state and notify listeners."""
+        with self._lock:
+            self._entries[key] = CachedState(state, time.monotonic())
+            listeners = list(self._listeners.get(key, ()))
+        for listener in listeners:
+            listener()
+
+    def is_stale(self, key: DeviceKey) -> bool:
+        """Return whether the device needs a refresh."""
+        cached = self.get(key)
+        return cached is None or cached.age >= self.soft_ttl
+
+    def is_expired(self, key: DeviceKey) -> bool:
+        """Return whether the device state is too old to report."""
+        cached = self.get(key)
+        return cached is None or cached.age >= self.hard_ttl
+
+    def begin_refresh(self, key: DeviceKey) -> bool:
+        """Claim the refresh of a device; False if one is already running."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, key: DeviceKey) -> None:
+        """Release the refresh claim of a device."""
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def add_listener(self, key: DeviceKey, listener: Callable[[], None]) -> Callable[[], None]:
+        """Register a listener for a device and return its remover."""
+        with self._lock:
+            self._listeners.setdefault(key, []).append(listener)
+
+        def remove() -> None:
+            with self._lock:
+                self._listeners[key].remove(listener)
+
+        return remove
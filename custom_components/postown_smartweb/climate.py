@@ -20,13 +20,12 @@ from .const import (
     CONF_DEVICE_NAME,
     DEVICE_TYPE_HEATER,
 )
+from .entity import SmartWebEntity
 from .hub import SmartWebHub
+from .pages import HVAC_HEAT, HVAC_OFF, PRESET_AWAY, PRESET_HOME
 
 _LOGGER = logging.getLogger(__name__)
 
-PRESET_AWAY = "away"
-PRESET_HOME = "home"
-
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -53,9 +52,10 @@ async def async_setup_entry(
     async_add_entities(entities, True)
 
 
-class SmartWebHeater(ClimateEntity):
+class SmartWebHeater(SmartWebEntity, ClimateEntity):
     """Representation of a Postown SmartWeb heater."""
 
+    _device_type = DEVICE_TYPE_HEATER
     _attr_hvac_modes = [HVACMode.HEAT, HVACMode.OFF]
     _attr_supported_features = (
         ClimateEntityFeature.TARGET_TEMPERATURE
@@ -77,108 +77,55 @@ class SmartWebHeater(ClimateEntity):
         entry_id: str,
     ) -> None:
         """Initialize the heater."""
-        self._hub = hub
+        super().__init__(hub, device_id)
         self._attr_name = name
-        self._device_id = device_id
-        self._url = f"{hub.host}/SmartWeb/My_Home/Detail_Control_Heater.aspx?device_no={device_id}"
         self._attr_hvac_mode = HVACMode.OFF
         self._attr_preset_mode = PRESET_HOME
         self._attr_target_temperature = 20
         self._attr_current_temperature = None
         self._attr_unique_id = f"{DOMAIN}_{entry_id}_heater_{device_id}"
 
-    def update(self) -> None:
-        """Fetch new state data for this heater."""
-        soup = self._hub.get_soup(self._url)
-        if not soup:
-            return
-
-        page_content = str(soup)
-
-        if "icon_b_boiler_away" in page_content:
-            self._attr_hvac_mode = HVACMode.HEAT
-            self._attr_preset_mode = PRESET_AWAY
-        elif "icon_b_boiler_on" in page_content:
-            self._attr_hvac_mode = HVACMode.HEAT
-            self._attr_preset_mode = PRESET_HOME
-        else:
-            self._attr_hvac_mode = HVACMode.OFF
-            self._attr_preset_mode = PRESET_HOME
-
-        try:
-            temp_input = soup.find(id="txtboxSetTemp")
-            if temp_input:
-                self._attr_target_temperature = float(temp_input.get("value", 20))
-                self._attr_current_temperature = self._attr_target_temperature
-                _LOGGER.debug(
-                    "%s - Temperature values updated: current=%.1f°C, target=%.1f°C",
-                    self._attr_name,
-                    self._attr_current_temperature,
-                    self._attr_target_temperature,
-                )
-        except (ValueError, TypeError):
-            pass
+    def _apply_state(self, state: dict) -> None:
+        """Apply the cached heater state."""
+        self._attr_hvac_mode = HVACMode(state["hvac_mode"])
+        self._attr_preset_mode = state["preset_mode"]
+
+        if state["target_temperature"] is not None:
+            self._attr_target_temperature = state["target_temperature"]
+            self._attr_current_temperature = self._attr_target_temperature
+            _LOGGER.debug(
+                "%s - Temperature values updated: current=%.1f°C, target=%.1f°C",
+                self._attr_name,
+                self._attr_current_temperature,
+                self._attr_target_temperature,
+            )
 
-    def set_hvac_mode(self, hvac_mode: HVACMode) -> None:
+    async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         """Set new target hvac mode."""
         if hvac_mode == HVACMode.HEAT:
-            self._send_command("btnOn")
-            self._attr_preset_mode = PRESET_HOME
+            await self.async_queue_command(
+                {"hvac_mode": HVAC_HEAT, "preset_mode": PRESET_HOME}
+            )
         elif hvac_mode == HVACMode.OFF:
-            self._send_command("btnOff")
+            await self.async_queue_command({"hvac_mode": HVAC_OFF, "preset_mode": None})
 
-    def set_preset_mode(self, preset_mode: str) -> None:
+    async def async_set_preset_mode(self, preset_mode: str) -> None:
         """Set new preset mode."""
-        if preset_mode == PRESET_AWAY:
-            self._send_command("btnAway")
-        elif preset_mode == PRESET_HOME:
-            if self._attr_hvac_mode == HVACMode.OFF:
-                self._send_command("btnOn")
-            elif self._attr_preset_mode == PRESET_AWAY:
-                self._send_command("btnOn")
-
-    def set_temperature(self, **kwargs) -> None:
+        if preset_mode in (PRESET_AWAY, PRESET_HOME):
+            await self.async_queue_command(
+                {"hvac_mode": HVAC_HEAT, "preset_mode": preset_mode}
+            )
+
+    async def async_set_temperature(self, **kwargs) -> None:
         """Set new target temperature."""
         temp = kwargs.get(ATTR_TEMPERATURE)
         if temp is None:
             return
 
-        old_temp = self._attr_target_temperature
-        self._attr_target_temperature = temp
         _LOGGER.debug(
             "%s - Setting target temperature: %.1f°C -> %.1f°C",
             self._attr_name,
-            old_temp,
+            self._attr_target_temperature,
             temp,
         )
-        self._send_command("btnTmpSet")
-
-    def _send_command(self, btn_id: str) -> None:
-        """Send command to the heater."""
-        soup = self._hub.get_soup(self._url)
-        if not soup:
-            return
-
-        try:
-            viewstate = soup.find(id="__VIEWSTATE")
-            generator = soup.find(id="__VIEWSTATEGENERATOR")
-            validation = soup.find(id="__EVENTVALIDATION")
-
-            if not viewstate:
-                _LOGGER.error("Could not find form fields for heater control")
-                return
-
-            payload = {
-                "__VIEWSTATE": viewstate["value"],
-                "__VIEWSTATEGENERATOR": generator["value"] if generator else "",
-                "__EVENTVALIDATION": validation["value"] if validation else "",
-                "__ASYNCPOST": "true",
-                "ScriptManager1": f"UpdatePanel1|{btn_id}",
-                "txtboxSetTemp": str(int(self._attr_target_temperature)),
-                f"{btn_id}.x": "30",
-                f"{btn_id}.y": "10",
-            }
-            if self._hub.send_command(self._url, payload):
-                self.update()
-        except Exception as e:
-            _LOGGER.error("Heater command error: %s", e)
+        await self.async_queue_command({"target_temperature": temp})
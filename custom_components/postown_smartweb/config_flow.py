@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Mapping
 from typing import Any
 
 import voluptuous as vol
@@ -30,6 +31,19 @@ DEVICE_TYPES = {
 }
 
 
+def _test_connection(host: str, username: str, password: str) -> bool:
+    """Create a throwaway hub and try to log in.
+
+    Runs in the executor, so the HTTP and parsing stack is only imported
+    once a connection test actually happens.
+    """
+    hub = SmartWebHub(host, username, password)
+    try:
+        return hub.test_connection()
+    finally:
+        hub.close()
+
+
 class PostownSmartWebConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Postown SmartWeb."""
 
@@ -41,6 +55,7 @@ class PostownSmartWebConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._username: str = ""
         self._password: str = ""
         self._devices: list[dict] = []
+        self._reauth_entry: config_entries.ConfigEntry | None = None
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -53,10 +68,10 @@ class PostownSmartWebConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             self._username = user_input[CONF_USERNAME]
             self._password = user_input[CONF_PASSWORD]
 
-            hub = SmartWebHub(self._host, self._username, self._password)
-
             try:
-                result = await self.hass.async_add_executor_job(hub.test_connection)
+                result = await self.hass.async_add_executor_job(
+                    _test_connection, self._host, self._username, self._password
+                )
                 if result:
                     await self.async_set_unique_id(f"{DOMAIN}_{self._host}")
                     self._abort_if_unique_id_configured()
@@ -80,6 +95,52 @@ class PostownSmartWebConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             },
         )
 
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """Handle credentials rejected by the server."""
+        self._reauth_entry = self.hass.config_entries.async_get_entry(
+            self.context["entry_id"]
+        )
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Ask for new credentials and store them once they work."""
+        errors: dict[str, str] = {}
+        entry = self._reauth_entry
+        assert entry is not None
+
+        if user_input is not None:
+            try:
+                result = await self.hass.async_add_executor_job(
+                    _test_connection,
+                    entry.data[CONF_HOST],
+                    user_input[CONF_USERNAME],
+                    user_input[CONF_PASSWORD],
+                )
+                if result:
+                    # The entry's update listener reloads it.
+                    self.hass.config_entries.async_update_entry(
+                        entry, data={**entry.data, **user_input}
+                    )
+                    return self.async_abort(reason="reauth_successful")
+                errors["base"] = "invalid_auth"
+            except Exception:
+                _LOGGER.exception("Unexpected error during connection test")
+                errors["base"] = "cannot_connect"
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema({
+                vol.Required(
+                    CONF_USERNAME, default=entry.data.get(CONF_USERNAME, "")
+                ): str,
+                vol.Required(CONF_PASSWORD): str,
+            }),
+            errors=errors,
+            description_placeholders={"host": entry.data[CONF_HOST]},
+        )
+
     async def async_step_add_device(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -219,14 +280,13 @@ class PostownSmartWebOptionsFlow(config_entries.OptionsFlow):
         errors: dict[str, str] = {}
 
         if user_input is not None:
-            hub = SmartWebHub(
-                user_input[CONF_HOST],
-                user_input[CONF_USERNAME],
-                user_input[CONF_PASSWORD],
-            )
-
             try:
-                result = await self.hass.async_add_executor_job(hub.test_connection)
+                result = await self.hass.async_add_executor_job(
+                    _test_connection,
+                    user_input[CONF_HOST],
+                    user_input[CONF_USERNAME],
+                    user_input[CONF_PASSWORD],
+                )
                 if result:
                     new_data = dict(self._config_entry.data)
                     new_data[CONF_HOST] = user_input[CONF_HOST]
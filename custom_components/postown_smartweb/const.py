@@ -11,3 +11,57 @@ DEVICE_TYPE_LIGHT = "light"
 DEVICE_TYPE_HEATER = "heater"
 
 DEFAULT_SCAN_INTERVAL = 30
+
+# Session keepalive. ASP.NET sessions expire after 20 idle minutes by default;
+# the hub adopts a different lifetime only after several expiries agree
+# within the tolerance, so a one-off server restart is not mistaken for a
+# short session. Learned lifetimes are forgotten after SESSION_LEARN_TTL.
+KEEPALIVE_INTERVAL = 60
+DEFAULT_SESSION_IDLE_TIMEOUT = 1200
+MIN_SESSION_LIFETIME = 120
+SESSION_EXPIRY_SAMPLES = 2
+SESSION_LIFETIME_TOLERANCE = 0.25
+SESSION_LEARN_TTL = 6 * 3600
+
+# Request timeouts in seconds, used until enough latency samples exist.
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 10
+LATENCY_WINDOW = 50
+# Hedged page reads wait for this many samples before trusting the p95.
+HEDGE_MIN_SAMPLES = 20
+
+# State cache freshness windows in seconds. Entities read cached state and
+# trigger a background refresh past the soft TTL; past the hard TTL the
+# state is reported unavailable.
+CACHE_SOFT_TTL = 20
+CACHE_HARD_TTL = 300
+
+# Command outbox. Commands are retried with exponential backoff between the
+# two delays and dropped once older than the maximum age.
+OUTBOX_STORAGE_VERSION = 1
+OUTBOX_SAVE_DELAY = 1
+OUTBOX_RETRY_MIN = 5
+OUTBOX_RETRY_MAX = 300
+OUTBOX_MAX_AGE = 6 * 3600
+
+# How devices are polled. "delta" re-renders only the UpdatePanel through a
+# side-effect-free async postback, "full" GETs the whole page, and "auto"
+# uses delta unless the server turns out not to support it.
+POLL_MODE_AUTO = "auto"
+POLL_MODE_DELTA = "delta"
+POLL_MODE_FULL = "full"
+
+# In "auto" mode, a server answering a panel poll with a regular page, or
+# repeatedly with a delta lacking the device panel, is polled with full page
+# loads for a while before delta is tried again.
+DELTA_MAX_FAILURES = 3
+DELTA_RETRY_INTERVAL = 3600
+# A panel re-rendered from viewstate can look complete but stay frozen. While
+# polling with deltas, each page is loaded in full this often and its state
+# compared with the delta's; a mismatch turns delta polling off as above.
+DELTA_VERIFY_INTERVAL = 600
+
+# Optional process pool for parsing pages. Pages are sent to the workers in
+# batches of at most this many to spread the inter-process overhead.
+PARSE_WORKERS = 2
+PARSE_BATCH_SIZE = 32
@@ -0,0 +1,109 @@
+"""Base entity for Postown SmartWeb."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.entity import Entity
+
+from .hub import SmartWebHub
+
+ATTR_STATE_AGE = "state_age"
+
+
+class SmartWebEntity(Entity):
+    """An entity backed by the hub's device state cache.
+
+    ``async_update`` never touches the network. It applies the cached state
+    and, once that state is older than the soft TTL, starts a background
+    refresh shared by every entity of the same device. The entity reports
+    unavailable once the cached state passes the hard TTL.
+
+    Commands go through the hub's outbox. Until a command is applied, its
+    desired state is shown on top of the cached state.
+    """
+
+    _device_type: str
+    _unrecorded_attributes = frozenset({ATTR_STATE_AGE})
+
+    def __init__(self, hub: SmartWebHub, device_id: str) -> None:
+        """Initialize the entity."""
+        self._hub = hub
+        self._device_id = device_id
+        self._cache_key = (self._device_type, device_id)
+
+    @property
+    def available(self) -> bool:
+        """Return whether the cached state is recent enough to report."""
+        return not self._hub.cache.is_expired(self._cache_key)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the age of the reported state."""
+        cached = self._hub.cache.get(self._cache_key)
+        if cached is None:
+            return {}
+        return {ATTR_STATE_AGE: round(cached.age)}
+
+    async def async_added_to_hass(self) -> None:
+        """Follow cache updates for this device."""
+        self.async_on_remove(
+            self._hub.cache.add_listener(self._cache_key, self._handle_cache_update)
+        )
+        # The first refresh may have finished before the listener existed.
+        self._apply_cached()
+
+    def _apply_cached(self) -> None:
+        """Apply the cached state with any queued command on top."""
+        cached = self._hub.cache.get(self._cache_key)
+        if cached is None:
+            return
+        state = dict(cached.state)
+        pending = self._hub.outbox.pending(self._cache_key)
+        if pending:
+            state.update({key: value for key, value in pending.items() if value is not None})
+        self._apply_state(state)
+
+    def _handle_cache_update(self) -> None:
+        """Hand a freshly cached state over to the event loop.
+
+        Runs in whichever thread updated the cache, usually an executor
+        thread, so the entity itself is only touched on the loop.
+        """
+        self.hass.loop.call_soon_threadsafe(self._async_handle_cache_update)
+
+    @callback
+    def _async_handle_cache_update(self) -> None:
+        """Apply the cached state and write it."""
+        self._apply_cached()
+        self.async_write_ha_state()
+
+    async def async_queue_command(self, desired: dict[str, Any]) -> None:
+        """Queue a desired state in the outbox and show it right away."""
+        self._hub.outbox.put(self._device_type, self._device_id, desired)
+        self._apply_cached()
+        self.async_write_ha_state()
+
+    async def async_update(self) -> None:
+        """Apply the cached state and revalidate it in the background if stale."""
+        cache = self._hub.cache
+        if cache.is_stale(self._cache_key) and cache.begin_refresh(self._cache_key):
+            self.hass.async_create_background_task(
+                self._async_refresh(),
+                f"postown_smartweb refresh {self._device_type} {self._device_id}",
+            )
+
+        self._apply_cached()
+
+    async def _async_refresh(self) -> None:
+        """Fetch the device state into the cache."""
+        try:
+            await self.hass.async_add_executor_job(
+                self._hub.poll_device, self._device_type, self._device_id
+            )
+        finally:
+            self._hub.cache.end_refresh(self._cache_key)
+
+    def _apply_state(self, state: dict[str, Any]) -> None:
+        """Copy a device state onto the entity attributes."""
+        raise NotImplementedError
@@ -1,34 +1,198 @@
 """Hub for Postown SmartWeb integration."""
+from __future__ import annotations
+
 import logging
-import requests
-from bs4 import BeautifulSoup
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any
+
+from .cache import DeviceKey, StateCache
+from .const import (
+    CACHE_HARD_TTL,
+    CACHE_SOFT_TTL,
+    DEFAULT_SESSION_IDLE_TIMEOUT,
+    DELTA_MAX_FAILURES,
+    DELTA_RETRY_INTERVAL,
+    DELTA_VERIFY_INTERVAL,
+    KEEPALIVE_INTERVAL,
+    MIN_SESSION_LIFETIME,
+    POLL_MODE_AUTO,
+    POLL_MODE_FULL,
+    SESSION_EXPIRY_SAMPLES,
+    SESSION_LEARN_TTL,
+    SESSION_LIFETIME_TOLERANCE,
+)
+from .latency import get_tracker
+from .outbox import CommandOutbox
+from .pages import (
+    FORM_FIELDS,
+    UPDATE_PANEL,
+    command_extra,
+    device_url,
+    form_fields,
+    panel_complete,
+    panel_payload,
+    parse_delta,
+    parse_state,
+    plan_buttons,
+    postback_payload,
+)
+from .transport import RequestsTransport, Transport, TransportError
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+    from .parse_pool import PageJob, ParsedPage
 
 _LOGGER = logging.getLogger(__name__)
 
+ASYNC_POST_HEADERS = {
+    "X-MicrosoftAjax": "Delta=true",
+    "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+    "X-Requested-With": "XMLHttpRequest",
+    "Cache-Control": "no-cache",
+}
+
 
 class SmartWebHub:
     """Handles the connection to the ASP.NET system."""
 
-    def __init__(self, host: str, username: str, password: str) -> None:
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str,
+        transport: Transport | None = None,
+        hedge_reads: bool = False,
+        poll_mode: str = POLL_MODE_AUTO,
+    ) -> None:
         """Initialize the hub."""
         self._host = host.rstrip("/")
         self._auth = {"ID": username, "PW": password}
-        self._session = requests.Session()
-        self._session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36",
-            "Accept-Language": "ko,en;q=0.9,en-US;q=0.8",
-        })
+        self._transport = transport or RequestsTransport()
+        self._latency = get_tracker(self._host)
+        self.cache = StateCache(CACHE_SOFT_TTL, CACHE_HARD_TTL)
+        self.outbox = CommandOutbox()
+        # Partial rendering polls reuse the hidden fields of the last page
+        # load, updated from every delta response.
+        self._poll_mode = poll_mode
+        self._delta_failures = 0
+        self._delta_off_until = 0.0
+        self._forms: dict[str, dict[str, str]] = {}
+        # When each page was last loaded in full, and delta states waiting
+        # for the batched full load that checks them.
+        self._page_loaded: dict[str, float] = {}
+        self._unverified: dict[DeviceKey, dict[str, Any]] = {}
+        # Session generation and viewstate when a batched page was fetched.
+        self._fetched: dict[DeviceKey, tuple[int, str | None]] = {}
+        self._stats_lock = threading.Lock()
+        self.poll_stats = {
+            mode: {"count": 0, "bytes": 0, "elapsed": 0.0}
+            for mode in ("full", "delta")
+        }
+        # Hedging duplicates slow page GETs only; postbacks are never hedged.
+        self._hedge_reads = hedge_reads
+        self._hedge_executor: ThreadPoolExecutor | None = None
+        self.hedged_reads = 0
+        self.hedge_wins = 0
+        self._login_lock = threading.Lock()
+        self._logged_in = False
+        # Set when the server rejected the credentials on the last login.
+        self.auth_failed = False
+        # Incremented on every successful login so concurrent callers that
+        # hit the same expired session only trigger one re-login.
+        self._generation = 0
+        # Session lifetime learned from observed expiries. ASP.NET sessions
+        # either slide with activity (idle timeout) or expire at a fixed age.
+        self._session_started = 0.0
+        self._last_activity = 0.0
+        self._idle_timeout = float(DEFAULT_SESSION_IDLE_TIMEOUT)
+        self._absolute_lifetime: float | None = None
+        self._expiry_samples: dict[str, deque[float]] = {
+            kind: deque(maxlen=SESSION_EXPIRY_SAMPLES) for kind in ("idle", "absolute")
+        }
+        self._learned_at: float | None = None
+        self._keepalive_url: str | None = None
 
     @property
     def host(self) -> str:
         """Return the host URL."""
         return self._host
 
+    @property
+    def transport(self) -> Transport:
+        """Return the transport used for all requests."""
+        return self._transport
+
+    def close(self) -> None:
+        """Close the underlying transport."""
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+        self._transport.close()
+
+    def _request(
+        self, method: str, url: str, slow: bool = False, **kwargs: Any
+    ) -> Any:
+        """Issue a request with a latency-derived timeout."""
+        start = time.monotonic()
+        try:
+            return self._transport.request(
+                method, url, timeout=self._latency.timeout(slow), **kwargs
+            )
+        finally:
+            if not slow:
+                # Postbacks are slow by nature and would skew page timeouts.
+                self._latency.record(time.monotonic() - start)
+
+    def _record_poll(self, mode: str, size: int, elapsed: float) -> None:
+        """Account a page load or panel postback in the poll statistics."""
+        with self._stats_lock:
+            stats = self.poll_stats[mode]
+            stats["count"] += 1
+            stats["bytes"] += size
+            stats["elapsed"] += elapsed
+
+    def _get_page(self, url: str) -> Any:
+        """GET an idempotent page, hedging it if it runs past the p95."""
+        delay = self._latency.hedge_delay() if self._hedge_reads else None
+        if delay is None:
+            return self._request("GET", url)
+
+        if self._hedge_executor is None:
+            self._hedge_executor = ThreadPoolExecutor(
+                max_workers=4, thread_name_prefix="smartweb_hedge"
+            )
+        primary = self._hedge_executor.submit(self._request, "GET", url)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        self.hedged_reads += 1
+        hedge = self._hedge_executor.submit(self._request, "GET", url)
+        pending = {primary, hedge}
+        error: Exception | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if future is hedge:
+                    self.hedge_wins += 1
+                return result
+        raise error
+
     def login(self) -> bool:
         """Perform full ASP.NET Login process."""
+        from bs4 import BeautifulSoup
+
         try:
             login_url = f"{self._host}/SmartWeb/Default.aspx"
-            r_get = self._session.get(login_url, timeout=10)
+            r_get = self._request("GET", login_url)
 
             soup = BeautifulSoup(r_get.text, "html.parser")
 
@@ -47,8 +211,8 @@ class SmartWebHub:
             }
             svc_payload = {"ID": self._auth["ID"], "PW": self._auth["PW"]}
 
-            r_svc = self._session.post(
-                svc_url, json=svc_payload, headers=svc_headers, timeout=10
+            r_svc = self._request(
+                "POST", svc_url, slow=True, json=svc_payload, headers=svc_headers
             )
             if r_svc.status_code != 200:
                 _LOGGER.error("WebService login check failed: %s", r_svc.status_code)
@@ -59,6 +223,7 @@ class SmartWebHub:
 
             if not login_token or ">" in str(login_token):
                 _LOGGER.error("Invalid login token received: %s", login_token)
+                self.auth_failed = True
                 return False
 
             post_headers = {
@@ -82,18 +247,23 @@ class SmartWebHub:
                 "__ASYNCPOST": "true",
             }
 
-            r_post = self._session.post(
-                login_url, data=payload, headers=post_headers, timeout=10
+            r_post = self._request(
+                "POST", login_url, slow=True, data=payload, headers=post_headers
             )
 
             if r_post.status_code == 200 and "pageRedirect" in r_post.text:
                 _LOGGER.info("Login successful")
+                self._logged_in = True
+                self.auth_failed = False
+                self._generation += 1
+                self._session_started = self._last_activity = time.monotonic()
                 return True
 
             _LOGGER.warning("Login failed: pageRedirect not found")
+            self._logged_in = False
             return False
 
-        except requests.RequestException as e:
+        except TransportError as e:
             _LOGGER.error("Login network error: %s", e)
             return False
         except Exception as e:
@@ -104,43 +274,489 @@ class SmartWebHub:
         """Test if connection and login work."""
         return self.login()
 
-    def get_soup(self, url: str) -> BeautifulSoup | None:
-        """Get page content with automatic re-login."""
+    def ensure_login(self) -> bool:
+        """Log in unless a session is already active."""
+        if self._logged_in:
+            return True
+        return self._relogin(self._generation)
+
+    def _note_expiry(self, generation: int) -> None:
+        """Learn the session lifetime from an observed expiry.
+
+        A lifetime is only adopted once the last few expiries of the same
+        kind agree, since a recycled app pool or a restarted server also
+        ends sessions early.
+        """
+        if not self._logged_in or generation != self._generation:
+            # Another caller already handled this session's expiry.
+            return
+        self._logged_in = False
+        now = time.monotonic()
+        idle = now - self._last_activity
+        age = now - self._session_started
+
+        if idle < age / 2:
+            # The session was in active use, so it hit a fixed lifetime.
+            kind, lifetime = "absolute", max(age, MIN_SESSION_LIFETIME)
+        else:
+            kind, lifetime = "idle", max(idle, MIN_SESSION_LIFETIME)
+
+        samples = self._expiry_samples[kind]
+        samples.append(lifetime)
+        if len(samples) < SESSION_EXPIRY_SAMPLES or max(samples) > min(samples) * (
+            1 + SESSION_LIFETIME_TOLERANCE
+        ):
+            _LOGGER.debug("Session expired after %.0fs (%s)", lifetime, kind)
+            return
+
+        lifetime = min(samples)
+        if kind == "absolute":
+            self._absolute_lifetime = lifetime
+        else:
+            self._idle_timeout = lifetime
+        self._learned_at = now
+        _LOGGER.debug("Learned %s session lifetime: %.0fs", kind, lifetime)
+
+    def _note_activity(self) -> None:
+        """Record a request the session survived.
+
+        A session that outlives a learned lifetime proves it too short, so
+        the estimate grows back.
+        """
+        now = time.monotonic()
+        idle = now - self._last_activity
+        if idle > self._idle_timeout:
+            _LOGGER.debug("Session survived %.0fs idle, raising idle timeout", idle)
+            self._idle_timeout = idle
+        if (
+            self._absolute_lifetime is not None
+            and now - self._session_started > self._absolute_lifetime
+        ):
+            _LOGGER.debug("Session outlived its learned lifetime, dropping it")
+            self._absolute_lifetime = None
+        self._last_activity = now
+
+    def _forget_lifetimes(self) -> None:
+        """Return to the default session lifetime once learning is stale.
+
+        Re-logging in ahead of a learned lifetime keeps sessions from ever
+        reaching the real one, so estimates are re-learned periodically.
+        """
+        if self._learned_at is None:
+            return
+        if time.monotonic() - self._learned_at < SESSION_LEARN_TTL:
+            return
+        _LOGGER.debug("Forgetting learned session lifetimes")
+        self._idle_timeout = float(DEFAULT_SESSION_IDLE_TIMEOUT)
+        self._absolute_lifetime = None
+        for samples in self._expiry_samples.values():
+            samples.clear()
+        self._learned_at = None
+
+    def keepalive(self, interval: float = KEEPALIVE_INTERVAL) -> None:
+        """Refresh the session before it expires.
+
+        Meant to be called every ``interval`` seconds. Polls already count as
+        activity, so this only sends traffic when the session has been idle
+        long enough to be at risk, or re-logs in ahead of a fixed lifetime.
+        """
+        self._forget_lifetimes()
+        if not self._logged_in or self._keepalive_url is None:
+            return
+
+        now = time.monotonic()
+        generation = self._generation
+
+        if self._absolute_lifetime is not None:
+            age = now - self._session_started
+            if age >= max(self._absolute_lifetime / 2, self._absolute_lifetime - 2 * interval):
+                _LOGGER.debug("Session nearing its lifetime, logging in ahead of expiry")
+                self._relogin(generation)
+                return
+
+        idle = now - self._last_activity
+        if idle < max(self._idle_timeout / 2, self._idle_timeout - 2 * interval):
+            return
+
+        _LOGGER.debug("Session idle for %.0fs, sending keepalive", idle)
+        try:
+            r = self._request("GET", self._keepalive_url)
+        except Exception as e:
+            _LOGGER.debug("Keepalive failed: %s", e)
+            return
+        if "Default.aspx" in r.url:
+            self._note_expiry(generation)
+            self._relogin(generation)
+        else:
+            self._note_activity()
+
+    def _relogin(self, generation: int) -> bool:
+        """Log in unless another caller already did since ``generation``."""
+        with self._login_lock:
+            if self._logged_in and self._generation != generation:
+                return True
+            return self.login()
+
+    def _fetch_page(self, url: str) -> Any:
+        """GET a page with automatic re-login."""
         try:
-            r = self._session.get(url, timeout=10)
+            generation = self._generation
+            if not self._logged_in:
+                if not self._relogin(generation):
+                    return None
+                generation = self._generation
+
+            start = time.monotonic()
+            r = self._get_page(url)
 
             if "Default.aspx" in r.url and "Default.aspx" not in url:
                 _LOGGER.info("Session expired, logging in...")
-                if self.login():
-                    r = self._session.get(url, timeout=10)
+                self._note_expiry(generation)
+                if self._relogin(generation):
+                    start = time.monotonic()
+                    r = self._get_page(url)
                     if "Default.aspx" in r.url:
                         _LOGGER.error("Failed to access page after login")
                         return None
                 else:
                     return None
 
-            return BeautifulSoup(r.text, "html.parser")
+            self._record_poll("full", len(r.content), time.monotonic() - start)
+            self._note_activity()
+            self._keepalive_url = url
+            self._page_loaded[url] = time.monotonic()
+            return r
         except Exception as e:
             _LOGGER.error("Network error accessing %s: %s", url, e)
             return None
 
-    def send_command(self, url: str, payload: dict) -> bool:
-        """Send command to device."""
-        headers = {
-            "X-MicrosoftAjax": "Delta=true",
-            "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-            "X-Requested-With": "XMLHttpRequest",
-            "Cache-Control": "no-cache",
-        }
+    def get_soup(self, url: str) -> BeautifulSoup | None:
+        """Get page content with automatic re-login."""
+        r = self._fetch_page(url)
+        if r is None:
+            return None
+        return self._page_soup(url, r.text)
+
+    def _page_soup(self, url: str, text: str) -> BeautifulSoup:
+        """Parse a full page, keeping its hidden form fields for postbacks."""
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(text, "html.parser")
+        fields = form_fields(soup)
+        if fields is not None:
+            self._forms[url] = fields
+        return soup
+
+    def _refresh_form_fields(self, url: str, payload: dict) -> dict | None:
+        """Return the payload with hidden form fields re-read from the page."""
+        soup = self.get_soup(url)
+        if not soup:
+            return None
+
+        fields = form_fields(soup)
+        if fields is None:
+            return None
+        return {**payload, **fields}
+
+    def _apply_delta(self, url: str, text: str) -> str | None:
+        """Track hidden fields from a delta response and return its panel HTML."""
+        entries = parse_delta(text)
+        if entries is None:
+            return None
+        return self._apply_entries(url, entries)
+
+    def _apply_entries(self, url: str, entries: list[tuple[str, str, str]]) -> str | None:
+        """Track hidden fields from parsed delta entries and return the panel."""
+        panel = None
+        fields = dict(self._forms.get(url, {}))
+        for kind, ident, content in entries:
+            if kind == "hiddenField" and ident in FORM_FIELDS:
+                fields[ident] = content
+            elif kind == "updatePanel" and ident == UPDATE_PANEL:
+                panel = content
+        if fields.get("__VIEWSTATE"):
+            self._forms[url] = fields
+        return panel
+
+    def _fetch_panel(self, device_type: str, url: str) -> str | None:
+        """Re-render a device's UpdatePanel instead of loading the page.
+
+        Returns None whenever the caller should fall back to a full GET:
+        no hidden fields yet, an expired session, or a response without a
+        usable panel. Only a regular page in reply, which shows the server
+        does no partial rendering, or repeated deltas without the panel turn
+        delta polling off, and then only for a cool-down period. Errors and
+        error entries just fall back for this poll.
+        """
+        fields = self._forms.get(url)
+        if fields is None or not self._logged_in:
+            return None
+
+        generation = self._generation
         try:
-            r = self._session.post(url, data=payload, headers=headers, timeout=10)
+            start = time.monotonic()
+            r = self._request(
+                "POST", url, data=panel_payload(fields), headers=ASYNC_POST_HEADERS
+            )
+            elapsed = time.monotonic() - start
+        except Exception as e:
+            _LOGGER.debug("Panel poll of %s failed: %s", url, e)
+            return None
+
+        if "Default.aspx" in r.url or "pageRedirect" in r.text:
+            # Let the full GET path handle the re-login.
+            self._note_expiry(generation)
+            return None
+
+        if r.status_code != 200:
+            _LOGGER.debug("Panel poll of %s returned HTTP %s", url, r.status_code)
+            return None
+        entries = parse_delta(r.text)
+        if entries is None:
+            self._disable_delta("Server answered a panel poll with a full page")
+            return None
+        if any(kind == "error" for kind, _, _ in entries):
+            _LOGGER.debug("Panel poll of %s failed on the server", url)
+            return None
+
+        panel = self._apply_entries(url, entries)
+        if panel is None or not panel_complete(device_type, panel):
+            self._delta_failures += 1
+            if self._delta_failures >= DELTA_MAX_FAILURES:
+                self._disable_delta("Server keeps returning deltas without the device panel")
+            return None
+
+        self._delta_failures = 0
+        self._record_poll("delta", len(r.content), elapsed)
+        self._note_activity()
+        self._keepalive_url = url
+        return panel
+
+    def _send_postback(self, url: str, payload: dict) -> tuple[bool, str | None]:
+        """Send a button postback.
+
+        Returns whether the server accepted it and the re-rendered panel
+        HTML of its delta response, if there was one.
+        """
+        try:
+            generation = self._generation
+            r = self._request("POST", url, slow=True, data=payload, headers=ASYNC_POST_HEADERS)
 
             if "pageRedirect" in r.text or "Default.aspx" in r.url:
                 _LOGGER.info("Session expired during command, re-logging...")
-                if self.login():
-                    r = self._session.post(url, data=payload, headers=headers, timeout=10)
+                self._note_expiry(generation)
+                if not self._relogin(generation):
+                    return False, None
+                # Hidden fields scraped under the old session are stale.
+                payload = self._refresh_form_fields(url, payload)
+                if payload is None:
+                    return False, None
+                r = self._request("POST", url, slow=True, data=payload, headers=ASYNC_POST_HEADERS)
 
-            return r.status_code == 200
+            if r.status_code != 200:
+                return False, None
+            self._note_activity()
+            return True, self._apply_delta(url, r.text)
         except Exception as e:
             _LOGGER.error("Command failed: %s", e)
+            return False, None
+
+    def _disable_delta(self, reason: str) -> None:
+        """Poll with full page loads for a while in auto mode."""
+        self._delta_failures = 0
+        if self._poll_mode != POLL_MODE_AUTO:
+            return
+        now = time.monotonic()
+        if self._delta_off_until <= now:
+            _LOGGER.info(
+                "%s, polling with full page loads for %d minutes",
+                reason, DELTA_RETRY_INTERVAL // 60,
+            )
+        self._delta_off_until = now + DELTA_RETRY_INTERVAL
+
+    def _verify_due(self, url: str) -> bool:
+        """Return whether a delta poll of a page should be checked in full."""
+        return time.monotonic() - self._page_loaded.get(url, 0.0) >= DELTA_VERIFY_INTERVAL
+
+    def _check_delta(
+        self, url: str, delta_state: dict[str, Any], state: dict[str, Any]
+    ) -> None:
+        """Stop delta polling if a panel postback disagreed with the page."""
+        if delta_state != state:
+            _LOGGER.warning(
+                "Panel postback of %s reported %s but the page shows %s",
+                url, delta_state, state,
+            )
+            self._disable_delta("Panel postbacks do not reflect the device state")
+
+    def _use_delta(self) -> bool:
+        """Return whether polls should try a panel postback first."""
+        if self._poll_mode == POLL_MODE_FULL:
+            return False
+        return self._poll_mode != POLL_MODE_AUTO or time.monotonic() >= self._delta_off_until
+
+    def _read_state(
+        self, device_type: str, url: str, full: bool = False
+    ) -> dict[str, Any] | None:
+        """Read a device state, through a panel postback unless ``full``.
+
+        A panel postback that is due for a check is followed by a full page
+        load, and the page's state is returned.
+        """
+        from bs4 import BeautifulSoup
+
+        delta_state = None
+        if not full and self._use_delta():
+            panel = self._fetch_panel(device_type, url)
+            if panel is not None:
+                delta_state = parse_state(
+                    device_type, BeautifulSoup(panel, "html.parser"), panel
+                )
+                if not self._verify_due(url):
+                    return delta_state
+
+        r = self._fetch_page(url)
+        if r is None:
+            return delta_state
+        state = parse_state(device_type, self._page_soup(url, r.text), r.text)
+        if delta_state is not None:
+            self._check_delta(url, delta_state, state)
+        return state
+
+    def poll_device(self, device_type: str, device_id: str) -> dict[str, Any] | None:
+        """Fetch and extract the current state of a device into the cache."""
+        url = device_url(self._host, device_type, device_id)
+        state = self._read_state(device_type, url)
+        if state is None:
+            return None
+        self.cache.set((device_type, device_id), state)
+        return state
+
+    def poll_devices(
+        self, devices: list[DeviceKey]
+    ) -> dict[DeviceKey, dict[str, Any] | None]:
+        """Poll several devices, parsing their pages in this thread."""
+        return {key: self.poll_device(*key) for key in devices}
+
+    def fetch_pages(
+        self, devices: list[DeviceKey]
+    ) -> tuple[dict[DeviceKey, dict[str, Any] | None], list[tuple[DeviceKey, PageJob]]]:
+        """Poll several devices, leaving full pages for the caller to parse.
+
+        UpdatePanel fragments are small and parsed here; shipping them to
+        another process would cost more than parsing them. Returns the
+        states polled so far and a parse job per full page, whose results
+        go to ``store_pages``. This lets one parse pool submission serve
+        the pages of many hubs. A panel due for a check is also loaded in
+        full, and ``store_pages`` compares the two.
+        """
+        from bs4 import BeautifulSoup
+
+        states: dict[DeviceKey, dict[str, Any] | None] = {}
+        pages: list[tuple[DeviceKey, PageJob]] = []
+        for key in devices:
+            device_type, device_id = key
+            url = device_url(self._host, device_type, device_id)
+            panel = self._fetch_panel(device_type, url) if self._use_delta() else None
+            if panel is not None:
+                state = parse_state(device_type, BeautifulSoup(panel, "html.parser"), panel)
+                self.cache.set(key, state)
+                states[key] = state
+                if not self._verify_due(url):
+                    continue
+                self._unverified[key] = state
+
+            r = self._fetch_page(url)
+            if r is None:
+                self._unverified.pop(key, None)
+                states.setdefault(key, None)
+                continue
+            self._fetched[key] = (self._generation, self._viewstate(url))
+            encoding = getattr(r, "encoding", None) or "utf-8"
+            pages.append((key, (device_type, r.content, encoding)))
+        return states, pages
+
+    def _viewstate(self, url: str) -> str | None:
+        """Return the viewstate currently held for a page."""
+        return self._forms.get(url, {}).get("__VIEWSTATE")
+
+    def store_pages(
+        self, results: list[tuple[DeviceKey, ParsedPage | None]]
+    ) -> dict[DeviceKey, dict[str, Any] | None]:
+        """Store the parsed pages returned for ``fetch_pages`` jobs.
+
+        Pages may be parsed while other work uses the hub. If a command
+        changed a page's viewstate since it was fetched, the parsed page is
+        older than what the hub holds and only the cached state is
+        returned. Hidden fields from an earlier session are not kept.
+        """
+        states: dict[DeviceKey, dict[str, Any] | None] = {}
+        for key, result in results:
+            delta_state = self._unverified.pop(key, None)
+            generation, viewstate = self._fetched.pop(key, (None, None))
+            url = device_url(self._host, *key)
+            if viewstate != self._viewstate(url):
+                cached = self.cache.get(key)
+                states[key] = cached.state if cached else None
+                continue
+            if result is None:
+                states[key] = delta_state
+                continue
+            state, fields = result
+            if fields is not None and generation == self._generation:
+                self._forms[url] = fields
+            if delta_state is not None:
+                self._check_delta(url, delta_state, state)
+            self.cache.set(key, state)
+            states[key] = state
+        return states
+
+    def apply_desired(
+        self, device_type: str, device_id: str, desired: dict[str, Any]
+    ) -> bool:
+        """Bring a device to a desired state.
+
+        The device is re-read first, through a panel postback where the
+        server supports it, so only the buttons still needed against the
+        current state are pressed. Each button's delta response carries the
+        new panel and hidden fields, so the result is checked without
+        loading the page again. Returns True once the device reports the
+        desired state.
+        """
+        from bs4 import BeautifulSoup
+
+        url = device_url(self._host, device_type, device_id)
+        key = (device_type, device_id)
+
+        current = self._read_state(device_type, url)
+        if current is None:
             return False
+        self.cache.set(key, current)
+
+        buttons = plan_buttons(device_type, current, desired)
+        if not buttons:
+            return True
+
+        extra = command_extra(device_type, current, desired)
+        for button in buttons:
+            fields = self._forms.get(url)
+            if fields is None:
+                _LOGGER.error("Could not find form fields for %s control", device_type)
+                return False
+            accepted, panel = self._send_postback(
+                url, postback_payload(fields, button, extra)
+            )
+            if not accepted:
+                return False
+            if panel is not None and panel_complete(device_type, panel):
+                current = parse_state(
+                    device_type, BeautifulSoup(panel, "html.parser"), panel
+                )
+            else:
+                # Without a delta the hidden fields are stale as well.
+                current = self._read_state(device_type, url, full=True)
+                if current is None:
+                    return False
+
+        self.cache.set(key, current)
+        return not plan_buttons(device_type, current, desired)
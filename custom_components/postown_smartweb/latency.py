@@ -0,0 +1,90 @@
+"""Latency tracking and adaptive timeouts for the Postown SmartWeb hub."""
+from __future__ import annotations
+
+import threading
+from collections import deque
+
+from .const import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    HEDGE_MIN_SAMPLES,
+    LATENCY_WINDOW,
+)
+
+# Bounds for derived timeouts, in seconds.
+MIN_CONNECT_TIMEOUT = 2.0
+MAX_CONNECT_TIMEOUT = 10.0
+MIN_READ_TIMEOUT = 3.0
+MAX_READ_TIMEOUT = 30.0
+# Login and command postbacks are slower on the server side and must not
+# time out on a congested server, so they keep the old 10 s as a floor.
+MIN_SLOW_READ_TIMEOUT = 10.0
+MAX_SLOW_READ_TIMEOUT = 60.0
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    """Clamp a value to a range."""
+    return max(low, min(high, value))
+
+
+class LatencyTracker:
+    """Keeps recent request latencies for one host."""
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        """Initialize the tracker."""
+        self._lock = threading.Lock()
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, elapsed: float) -> None:
+        """Record the latency of a completed or timed out request."""
+        with self._lock:
+            self._samples.append(elapsed)
+
+    def percentile(self, percent: float) -> float | None:
+        """Return a latency percentile, or None without samples."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * percent / 100))
+        return samples[index]
+
+    @property
+    def sample_count(self) -> int:
+        """Return the number of samples in the window."""
+        with self._lock:
+            return len(self._samples)
+
+    def timeout(self, slow: bool = False) -> tuple[float, float]:
+        """Return a ``(connect, read)`` timeout derived from recent latency."""
+        p50 = self.percentile(50)
+        p95 = self.percentile(95)
+        if p50 is None or p95 is None:
+            read = DEFAULT_READ_TIMEOUT * 2 if slow else DEFAULT_READ_TIMEOUT
+            return DEFAULT_CONNECT_TIMEOUT, read
+
+        connect = _clamp(3 * p50, MIN_CONNECT_TIMEOUT, MAX_CONNECT_TIMEOUT)
+        if slow:
+            read = _clamp(8 * p95, MIN_SLOW_READ_TIMEOUT, MAX_SLOW_READ_TIMEOUT)
+        else:
+            read = _clamp(4 * p95, MIN_READ_TIMEOUT, MAX_READ_TIMEOUT)
+        return connect, read
+
+    def hedge_delay(self) -> float | None:
+        """Return the delay before hedging a read, or None if unknown yet."""
+        if self.sample_count < HEDGE_MIN_SAMPLES:
+            return None
+        return self.percentile(95)
+
+
+_TRACKERS: dict[str, LatencyTracker] = {}
+_TRACKERS_LOCK = threading.Lock()
+
+
+def get_tracker(host: str) -> LatencyTracker:
+    """Return the tracker shared by every hub talking to ``host``."""
+    with _TRACKERS_LOCK:
+        tracker = _TRACKERS.get(host)
+        if tracker is None:
+            tracker = _TRACKERS[host] = LatencyTracker()
+        return tracker
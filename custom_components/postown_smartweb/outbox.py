@@ -0,0 +1,250 @@
+"""Durable command outbox for the Postown SmartWeb hub.
+
+Commands are stored as the desired state of a device rather than as button
+presses. A newer command for the same device is merged over the pending one
+(last write wins), so after an outage only the latest desired state is sent.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from .cache import DeviceKey
+from .const import (
+    OUTBOX_MAX_AGE,
+    OUTBOX_RETRY_MAX,
+    OUTBOX_RETRY_MIN,
+    OUTBOX_SAVE_DELAY,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.storage import Store
+
+    from .hub import SmartWebHub
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class OutboxEntry:
+    """The pending desired state of one device."""
+
+    __slots__ = ("desired", "seq", "queued_at", "attempts", "next_attempt")
+
+    def __init__(self, desired: dict[str, Any], seq: int, queued_at: float) -> None:
+        """Initialize the entry."""
+        self.desired = desired
+        self.seq = seq
+        self.queued_at = queued_at
+        self.attempts = 0
+        self.next_attempt = 0.0
+
+
+class CommandOutbox:
+    """Pending desired device states, coalesced per device.
+
+    Times are wall-clock so entries survive a restart. ``seq`` changes on
+    every merge, letting a drain that raced with a newer command leave the
+    newer desired state in place.
+    """
+
+    def __init__(self, max_age: float = OUTBOX_MAX_AGE) -> None:
+        """Initialize the outbox."""
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._entries: dict[DeviceKey, OutboxEntry] = {}
+        self._seq = 0
+        self._listeners: list[Callable[[], None]] = []
+
+    def __len__(self) -> int:
+        """Return the number of devices with pending commands."""
+        with self._lock:
+            return len(self._entries)
+
+    def add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Register a listener called after each new command."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def put(self, device_type: str, device_id: str, desired: dict[str, Any]) -> None:
+        """Queue a desired state, merging it over any pending one."""
+        key = (device_type, device_id)
+        with self._lock:
+            self._seq += 1
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = OutboxEntry(dict(desired), self._seq, time.time())
+            else:
+                entry.desired.update(desired)
+                entry.seq = self._seq
+                entry.queued_at = time.time()
+                entry.attempts = 0
+                entry.next_attempt = 0.0
+        for listener in list(self._listeners):
+            listener()
+
+    def pending(self, key: DeviceKey) -> dict[str, Any] | None:
+        """Return the pending desired state of a device."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return dict(entry.desired) if entry else None
+
+    def due(self, now: float) -> list[tuple[DeviceKey, dict[str, Any], int]]:
+        """Return the entries ready to be sent, dropping expired ones."""
+        due = []
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if now - entry.queued_at > self._max_age:
+                    _LOGGER.warning(
+                        "Dropping command for %s %s queued %.0f minutes ago",
+                        key[0], key[1], (now - entry.queued_at) / 60,
+                    )
+                    del self._entries[key]
+                elif entry.next_attempt <= now:
+                    due.append((key, dict(entry.desired), entry.seq))
+        return due
+
+    def complete(self, key: DeviceKey, seq: int) -> None:
+        """Remove an entry unless a newer command replaced it meanwhile."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.seq == seq:
+                del self._entries[key]
+
+    def retry_later(self, key: DeviceKey, seq: int, now: float) -> float:
+        """Back off an entry after a failed attempt and return the delay."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.seq != seq:
+                return 0.0
+            entry.attempts += 1
+            delay = min(OUTBOX_RETRY_MAX, OUTBOX_RETRY_MIN * 2 ** (entry.attempts - 1))
+            entry.next_attempt = now + delay
+            return delay
+
+    def next_due(self) -> float | None:
+        """Return when the next entry becomes due."""
+        with self._lock:
+            if not self._entries:
+                return None
+            return min(entry.next_attempt for entry in self._entries.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the outbox in a JSON serializable form."""
+        with self._lock:
+            return {
+                "entries": [
+                    {
+                        "device_type": key[0],
+                        "device_id": key[1],
+                        "desired": entry.desired,
+                        "queued_at": entry.queued_at,
+                    }
+                    for key, entry in self._entries.items()
+                ]
+            }
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """Load entries saved by ``as_dict``."""
+        with self._lock:
+            for item in data.get("entries", []):
+                self._seq += 1
+                key = (item["device_type"], item["device_id"])
+                self._entries[key] = OutboxEntry(
+                    item["desired"], self._seq, item["queued_at"]
+                )
+
+
+class OutboxRunner:
+    """Persists a hub's outbox and drains it from Home Assistant."""
+
+    def __init__(
+        self, hass: HomeAssistant, hub: SmartWebHub, store: Store
+    ) -> None:
+        """Initialize the runner."""
+        self._hass = hass
+        self._hub = hub
+        self._store = store
+        self._task: Any = None
+        self._timer: Any = None
+        self._rerun = False
+        self._remove_listener: Callable[[], None] | None = None
+
+    async def async_load(self) -> None:
+        """Restore commands queued before a restart."""
+        data = await self._store.async_load()
+        if data:
+            self._hub.outbox.restore(data)
+            if len(self._hub.outbox):
+                _LOGGER.info("Restored %d queued commands", len(self._hub.outbox))
+
+    def async_start(self) -> None:
+        """Start draining, including any restored commands."""
+        self._remove_listener = self._hub.outbox.add_listener(self._handle_put)
+        self.async_kick()
+
+    async def async_stop(self) -> None:
+        """Stop draining and flush the outbox to storage."""
+        if self._remove_listener is not None:
+            self._remove_listener()
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._task is not None:
+            self._task.cancel()
+        await self._store.async_save(self._hub.outbox.as_dict())
+
+    def _handle_put(self) -> None:
+        """Persist and drain after a new command."""
+        self._async_save()
+        self.async_kick()
+
+    def _async_save(self) -> None:
+        """Schedule a save of the outbox."""
+        self._store.async_delay_save(self._hub.outbox.as_dict, OUTBOX_SAVE_DELAY)
+
+    def async_kick(self) -> None:
+        """Start a drain, or make the running one go round again."""
+        if self._task is not None and not self._task.done():
+            self._rerun = True
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._task = self._hass.async_create_background_task(
+            self._async_drain(), "postown_smartweb outbox"
+        )
+
+    async def _async_drain(self) -> None:
+        """Send every due command, backing off the ones that fail."""
+        outbox = self._hub.outbox
+        while True:
+            self._rerun = False
+            for key, desired, seq in outbox.due(time.time()):
+                try:
+                    ok = await self._hass.async_add_executor_job(
+                        self._hub.apply_desired, key[0], key[1], desired
+                    )
+                except Exception:
+                    _LOGGER.exception("Unexpected error sending %s %s", *key)
+                    ok = False
+
+                if ok:
+                    outbox.complete(key, seq)
+                else:
+                    delay = outbox.retry_later(key, seq, time.time())
+                    _LOGGER.warning(
+                        "Command for %s %s not applied, retrying in %.0fs",
+                        key[0], key[1], delay,
+                    )
+            self._async_save()
+            if not self._rerun:
+                break
+
+        next_due = outbox.next_due()
+        if next_due is not None:
+            self._timer = self._hass.loop.call_later(
+                max(0.0, next_due - time.time()), self.async_kick
+            )
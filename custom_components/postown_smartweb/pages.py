@@ -0,0 +1,232 @@
+"""Page extraction for Postown SmartWeb detail pages.
+
+Turns detail pages into compact device states and builds the UpdatePanel
+postbacks that operate devices. Shared by the Home Assistant platforms and
+the standalone poller daemon.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from .const import DEVICE_TYPE_HEATER, DEVICE_TYPE_LIGHT
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+PAGE_PATHS = {
+    DEVICE_TYPE_LIGHT: "/SmartWeb/My_Home/Detail_Control_Light.aspx",
+    DEVICE_TYPE_HEATER: "/SmartWeb/My_Home/Detail_Control_Heater.aspx",
+}
+
+HVAC_HEAT = "heat"
+HVAC_OFF = "off"
+PRESET_HOME = "home"
+PRESET_AWAY = "away"
+
+BUTTON_ON = "btnOn"
+BUTTON_OFF = "btnOff"
+BUTTON_AWAY = "btnAway"
+BUTTON_SET_TEMPERATURE = "btnTmpSet"
+
+DEFAULT_TARGET_TEMPERATURE = 20.0
+
+FORM_FIELDS = ("__VIEWSTATE", "__VIEWSTATEGENERATOR", "__EVENTVALIDATION")
+UPDATE_PANEL = "UpdatePanel1"
+
+# Markers an UpdatePanel fragment must contain to be trusted for a state.
+PANEL_MARKERS = {
+    DEVICE_TYPE_LIGHT: ("icon_b_light_",),
+    DEVICE_TYPE_HEATER: ("icon_b_boiler_", "txtboxSetTemp"),
+}
+
+
+def device_url(host: str, device_type: str, device_id: str) -> str:
+    """Return the detail page URL of a device."""
+    return f"{host}{PAGE_PATHS[device_type]}?device_no={device_id}"
+
+
+def parse_light(soup: BeautifulSoup, text: str | None = None) -> dict[str, Any]:
+    """Extract the state of a light from its detail page.
+
+    ``text`` is the page source the soup was built from, if at hand; the
+    marker scan then skips re-serializing the whole tree.
+    """
+    page_content = text if text is not None else str(soup)
+    return {"is_on": "icon_b_light_on" in page_content}
+
+
+def parse_heater(soup: BeautifulSoup, text: str | None = None) -> dict[str, Any]:
+    """Extract the state of a heater from its detail page."""
+    page_content = text if text is not None else str(soup)
+
+    if "icon_b_boiler_away" in page_content:
+        state = {"hvac_mode": HVAC_HEAT, "preset_mode": PRESET_AWAY}
+    elif "icon_b_boiler_on" in page_content:
+        state = {"hvac_mode": HVAC_HEAT, "preset_mode": PRESET_HOME}
+    else:
+        state = {"hvac_mode": HVAC_OFF, "preset_mode": PRESET_HOME}
+
+    state["target_temperature"] = None
+    temp_input = soup.find(id="txtboxSetTemp")
+    if temp_input:
+        try:
+            state["target_temperature"] = float(
+                temp_input.get("value", DEFAULT_TARGET_TEMPERATURE)
+            )
+        except (ValueError, TypeError):
+            pass
+    return state
+
+
+PARSERS = {
+    DEVICE_TYPE_LIGHT: parse_light,
+    DEVICE_TYPE_HEATER: parse_heater,
+}
+
+
+def parse_state(
+    device_type: str, soup: BeautifulSoup, text: str | None = None
+) -> dict[str, Any]:
+    """Extract the state of any supported device."""
+    return PARSERS[device_type](soup, text)
+
+
+def form_fields(soup: BeautifulSoup) -> dict[str, str] | None:
+    """Return the ASP.NET hidden form fields of a page.
+
+    Returns None when the page has no viewstate.
+    """
+    fields = {}
+    for field in FORM_FIELDS:
+        tag = soup.find(id=field)
+        fields[field] = tag["value"] if tag else ""
+    if not fields["__VIEWSTATE"]:
+        return None
+    return fields
+
+
+def postback_payload(
+    fields: dict[str, str],
+    button: str,
+    extra: dict[str, str] | None = None,
+) -> dict[str, str]:
+    """Build the async postback that presses ``button`` from known form fields."""
+    payload = {
+        **fields,
+        "__ASYNCPOST": "true",
+        "ScriptManager1": f"{UPDATE_PANEL}|{button}",
+    }
+    if extra:
+        payload.update(extra)
+    payload[f"{button}.x"] = "30"
+    payload[f"{button}.y"] = "10"
+    return payload
+
+
+def heater_extra(target_temperature: float) -> dict[str, str]:
+    """Return the heater form fields sent with every heater postback."""
+    return {"txtboxSetTemp": str(int(target_temperature))}
+
+
+def plan_light(current: dict[str, Any], desired: dict[str, Any]) -> list[str]:
+    """Return the buttons that take a light to the desired state."""
+    if "is_on" in desired and desired["is_on"] != current["is_on"]:
+        return [BUTTON_ON if desired["is_on"] else BUTTON_OFF]
+    return []
+
+
+def plan_heater(current: dict[str, Any], desired: dict[str, Any]) -> list[str]:
+    """Return the buttons that take a heater to the desired state."""
+    buttons = []
+    hvac_mode = desired.get("hvac_mode")
+    is_off = current["hvac_mode"] == HVAC_OFF
+
+    if hvac_mode == HVAC_OFF:
+        if not is_off:
+            buttons.append(BUTTON_OFF)
+    elif hvac_mode == HVAC_HEAT:
+        if desired.get("preset_mode") == PRESET_AWAY:
+            if is_off or current["preset_mode"] != PRESET_AWAY:
+                buttons.append(BUTTON_AWAY)
+        elif is_off or current["preset_mode"] == PRESET_AWAY:
+            buttons.append(BUTTON_ON)
+
+    # The page only takes whole degrees.
+    target = desired.get("target_temperature")
+    current_target = current.get("target_temperature")
+    if target is not None and (current_target is None or int(target) != int(current_target)):
+        buttons.append(BUTTON_SET_TEMPERATURE)
+    return buttons
+
+
+PLANNERS = {
+    DEVICE_TYPE_LIGHT: plan_light,
+    DEVICE_TYPE_HEATER: plan_heater,
+}
+
+
+def plan_buttons(
+    device_type: str, current: dict[str, Any], desired: dict[str, Any]
+) -> list[str]:
+    """Return the buttons that take any supported device to the desired state."""
+    return PLANNERS[device_type](current, desired)
+
+
+def command_extra(
+    device_type: str, current: dict[str, Any], desired: dict[str, Any]
+) -> dict[str, str] | None:
+    """Return the extra form fields sent with postbacks for a desired state."""
+    if device_type != DEVICE_TYPE_HEATER:
+        return None
+    target = desired.get("target_temperature")
+    if target is None:
+        target = current.get("target_temperature") or DEFAULT_TARGET_TEMPERATURE
+    return heater_extra(target)
+
+
+def panel_payload(fields: dict[str, str]) -> dict[str, str]:
+    """Build a side-effect-free async postback that re-renders the panel.
+
+    Targeting the UpdatePanel itself, as ``__doPostBack('UpdatePanel1', '')``
+    does, runs no button handler; the server only renders the panel again.
+    """
+    return {
+        "ScriptManager1": f"{UPDATE_PANEL}|{UPDATE_PANEL}",
+        "__EVENTTARGET": UPDATE_PANEL,
+        "__EVENTARGUMENT": "",
+        **fields,
+        "__ASYNCPOST": "true",
+    }
+
+
+def parse_delta(text: str) -> list[tuple[str, str, str]] | None:
+    """Split an ASP.NET partial rendering response into its entries.
+
+    The format is a sequence of ``length|type|id|content|`` records. Returns
+    None when the text is not in that format.
+    """
+    entries = []
+    pos = 0
+    try:
+        while pos < len(text):
+            length_end = text.index("|", pos)
+            length = int(text[pos:length_end])
+            type_end = text.index("|", length_end + 1)
+            id_end = text.index("|", type_end + 1)
+            content_end = id_end + 1 + length
+            if text[content_end] != "|":
+                return None
+            entries.append((
+                text[length_end + 1:type_end],
+                text[type_end + 1:id_end],
+                text[id_end + 1:content_end],
+            ))
+            pos = content_end + 1
+    except (ValueError, IndexError):
+        return None
+    return entries
+
+
+def panel_complete(device_type: str, html: str) -> bool:
+    """Return whether a panel fragment carries everything the parser needs."""
+    return all(marker in html for marker in PANEL_MARKERS[device_type])
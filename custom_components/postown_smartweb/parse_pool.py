@@ -0,0 +1,128 @@
+"""Process pool for parsing Postown SmartWeb pages.
+
+Parsing a detail page with BeautifulSoup is pure Python and holds the GIL
+for its whole duration. With hundreds of devices that starves every other
+thread of the process. ``ParsePool`` ships raw page bytes to worker
+processes in batches and returns only the compact device state and hidden
+form fields of each page. The overhead only pays off for full pages in
+batches of dozens, so callers gather the pages of many hubs into one call.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from .const import PARSE_BATCH_SIZE, PARSE_WORKERS
+from .pages import form_fields, parse_state
+
+_LOGGER = logging.getLogger(__name__)
+
+# (device type, page body, body encoding)
+PageJob = tuple[str, bytes, str]
+# (device state, hidden form fields or None)
+ParsedPage = tuple[dict[str, Any], dict[str, str] | None]
+
+
+def parse_page(device_type: str, content: bytes, encoding: str) -> ParsedPage:
+    """Parse a detail page or panel fragment into its state and form fields."""
+    from bs4 import BeautifulSoup
+
+    text = content.decode(encoding, "replace")
+    soup = BeautifulSoup(text, "html.parser")
+    return parse_state(device_type, soup, text), form_fields(soup)
+
+
+def parse_batch(jobs: list[PageJob]) -> list[ParsedPage | None]:
+    """Parse a batch of pages; a page that fails to parse yields None."""
+    results: list[ParsedPage | None] = []
+    for device_type, content, encoding in jobs:
+        try:
+            results.append(parse_page(device_type, content, encoding))
+        except Exception:
+            _LOGGER.exception("Could not parse %s page", device_type)
+            results.append(None)
+    return results
+
+
+def _warm_up() -> None:
+    """Import the parser in a worker ahead of the first batch."""
+    import bs4  # noqa: F401
+
+
+class ParsePool:
+    """Parses pages in worker processes.
+
+    Workers are started on first use with the ``spawn`` method, since forking
+    a process that runs threads is unsafe. One pool can be shared by any
+    number of hubs. If the pool breaks, the batch is parsed in the calling
+    thread and a fresh pool is started on the next call.
+    """
+
+    def __init__(
+        self, workers: int = PARSE_WORKERS, batch_size: int = PARSE_BATCH_SIZE
+    ) -> None:
+        """Initialize the pool."""
+        self._workers = workers
+        self._batch_size = batch_size
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Return the executor, starting the workers if needed."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def start(self) -> None:
+        """Start the workers and load the parser in each of them."""
+        executor = self._get_executor()
+        for future in [executor.submit(_warm_up) for _ in range(self._workers)]:
+            future.result()
+
+    @property
+    def capacity(self) -> int:
+        """Return how many pages keep every worker busy with a full batch."""
+        return self._workers * self._batch_size
+
+    def batches(self, jobs: list[PageJob]) -> list[list[PageJob]]:
+        """Split jobs into as few batches as the batch size allows.
+
+        Batches are balanced in size. A fleet below the batch size stays in
+        one batch: splitting it would pay the inter-process overhead for
+        each page while the parse itself is short.
+        """
+        if not jobs:
+            return []
+        count = math.ceil(len(jobs) / self._batch_size)
+        size = math.ceil(len(jobs) / count)
+        return [jobs[i:i + size] for i in range(0, len(jobs), size)]
+
+    def parse(self, jobs: list[PageJob]) -> list[ParsedPage | None]:
+        """Parse pages in the workers, returning results in job order."""
+        try:
+            executor = self._get_executor()
+            futures = [executor.submit(parse_batch, batch) for batch in self.batches(jobs)]
+            return [result for future in futures for result in future.result()]
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            _LOGGER.warning("Parse pool failed, parsing in-thread: %s", e)
+            with self._lock:
+                executor, self._executor = self._executor, None
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            return parse_batch(jobs)
+
+    def close(self) -> None:
+        """Stop the workers."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -20,6 +20,7 @@ from .const import (
     CONF_DEVICE_NAME,
     DEVICE_TYPE_HEATER,
 )
+from .entity import SmartWebEntity
 from .hub import SmartWebHub
 
 _LOGGER = logging.getLogger(__name__)
@@ -62,12 +63,13 @@ async def async_setup_entry(
     async_add_entities(entities, True)
 
 
-class SmartWebTemperatureSensor(SensorEntity):
+class SmartWebTemperatureSensor(SmartWebEntity, SensorEntity):
     """Representation of a Postown SmartWeb temperature sensor."""
 
     _attr_device_class = SensorDeviceClass.TEMPERATURE
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
+    _device_type = DEVICE_TYPE_HEATER
 
     def __init__(
         self,
@@ -78,11 +80,9 @@ class SmartWebTemperatureSensor(SensorEntity):
         sensor_type: str,  # "current" or "target"
     ) -> None:
         """Initialize the temperature sensor."""
-        self._hub = hub
-        self._device_id = device_id
+        super().__init__(hub, device_id)
         self._device_name = device_name
         self._sensor_type = sensor_type
-        self._url = f"{hub.host}/SmartWeb/My_Home/Detail_Control_Heater.aspx?device_no={device_id}"
         self._attr_native_value = None
 
         # Set name and unique_id based on sensor type
@@ -95,26 +95,19 @@ class SmartWebTemperatureSensor(SensorEntity):
             self._attr_unique_id = f"{DOMAIN}_{entry_id}_heater_{device_id}_target_temp"
             self._attr_translation_key = "heater_target_temperature"
 
-    def update(self) -> None:
-        """Fetch new temperature data."""
-        soup = self._hub.get_soup(self._url)
-        if not soup:
+    def _apply_state(self, state: dict) -> None:
+        """Apply the cached heater temperature."""
+        temperature = state["target_temperature"]
+        if temperature is None:
             return
 
-        try:
-            temp_input = soup.find(id="txtboxSetTemp")
-            if temp_input:
-                temperature = float(temp_input.get("value", 20))
+        # For now, both current and target use the same value from the web page
+        # This matches the behavior in climate.py
+        self._attr_native_value = temperature
 
-                # For now, both current and target use the same value from the web page
-                # This matches the behavior in climate.py
-                self._attr_native_value = temperature
-
-                _LOGGER.debug(
-                    "%s - Temperature sensor updated: %s=%.1f°C",
-                    self._device_name,
-                    self._sensor_type,
-                    temperature,
-                )
-        except (ValueError, TypeError) as e:
-            _LOGGER.error("Failed to parse temperature for %s: %s", self._device_name, e)
+        _LOGGER.debug(
+            "%s - Temperature sensor updated: %s=%.1f°C",
+            self._device_name,
+            self._sensor_type,
+            temperature,
+        )
@@ -15,6 +15,7 @@ from .const import (
     CONF_DEVICE_NAME,
     DEVICE_TYPE_LIGHT,
 )
+from .entity import SmartWebEntity
 from .hub import SmartWebHub
 
 _LOGGER = logging.getLogger(__name__)
@@ -45,9 +46,11 @@ async def async_setup_entry(
     async_add_entities(entities, True)
 
 
-class SmartWebLight(SwitchEntity):
+class SmartWebLight(SmartWebEntity, SwitchEntity):
     """Representation of a Postown SmartWeb light switch."""
 
+    _device_type = DEVICE_TYPE_LIGHT
+
     def __init__(
         self,
         hub: SmartWebHub,
@@ -56,54 +59,19 @@ class SmartWebLight(SwitchEntity):
         entry_id: str,
     ) -> None:
         """Initialize the light switch."""
-        self._hub = hub
+        super().__init__(hub, device_id)
         self._attr_name = name
-        self._device_id = device_id
-        self._url = f"{hub.host}/SmartWeb/My_Home/Detail_Control_Light.aspx?device_no={device_id}"
         self._attr_is_on = False
         self._attr_unique_id = f"{DOMAIN}_{entry_id}_light_{device_id}"
 
-    def update(self) -> None:
-        """Fetch new state data for this light."""
-        soup = self._hub.get_soup(self._url)
-        if soup and "icon_b_light_on" in str(soup):
-            self._attr_is_on = True
-        else:
-            self._attr_is_on = False
+    def _apply_state(self, state: dict) -> None:
+        """Apply the cached light state."""
+        self._attr_is_on = state["is_on"]
 
-    def turn_on(self, **kwargs) -> None:
+    async def async_turn_on(self, **kwargs) -> None:
         """Turn the light on."""
-        self._operate("on")
+        await self.async_queue_command({"is_on": True})
 
-    def turn_off(self, **kwargs) -> None:
+    async def async_turn_off(self, **kwargs) -> None:
         """Turn the light off."""
-        self._operate("off")
-
-    def _operate(self, action: str) -> None:
-        """Perform on/off operation."""
-        soup = self._hub.get_soup(self._url)
-        if not soup:
-            return
-
-        try:
-            viewstate = soup.find(id="__VIEWSTATE")
-            generator = soup.find(id="__VIEWSTATEGENERATOR")
-            validation = soup.find(id="__EVENTVALIDATION")
-
-            if not viewstate:
-                _LOGGER.error("Could not find form fields for light control")
-                return
-
-            payload = {
-                "__VIEWSTATE": viewstate["value"],
-                "__VIEWSTATEGENERATOR": generator["value"] if generator else "",
-                "__EVENTVALIDATION": validation["value"] if validation else "",
-                "__ASYNCPOST": "true",
-                "ScriptManager1": f"UpdatePanel1|btn{action.capitalize()}",
-                f"btn{action.capitalize()}.x": "30",
-                f"btn{action.capitalize()}.y": "10",
-            }
-            if self._hub.send_command(self._url, payload):
-                self._attr_is_on = action == "on"
-        except Exception as e:
-            _LOGGER.error("Error controlling light: %s", e)
+        await self.async_queue_command({"is_on": False})
@@ -0,0 +1,305 @@
+"""HTTP transports for the Postown SmartWeb hub.
+
+The hub talks to the server through a transport object instead of a bare
+``requests.Session``. Besides the live transport, a recording transport can
+capture a real session into a redacted cassette file and a replay transport
+can serve that cassette offline, so traces from real buildings can be
+reproduced and compared between versions.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+_LOGGER = logging.getLogger(__name__)
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36"
+)
+
+CASSETTE_VERSION = 2
+# Version 1 cassettes lack recorded errors but replay unchanged.
+SUPPORTED_CASSETTE_VERSIONS = (1, CASSETTE_VERSION)
+REDACTED = "REDACTED"
+
+# Form and JSON fields that carry credentials or the login token.
+SENSITIVE_FIELDS = {"ID", "PW", "txtID", "txtPW", "Hidden1"}
+
+
+class TransportError(Exception):
+    """Raised when a transport cannot produce a response."""
+
+
+class CassetteMissError(TransportError):
+    """Raised when a replayed request has no recorded response left."""
+
+
+class TransportResponse:
+    """Minimal response object shared by the offline transports."""
+
+    def __init__(
+        self,
+        status_code: int,
+        url: str,
+        text: str,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        """Initialize the response."""
+        self.status_code = status_code
+        self.url = url
+        self.text = text
+        self.headers = headers or {}
+
+    @property
+    def content(self) -> bytes:
+        """Return the body as bytes."""
+        return self.text.encode("utf-8")
+
+    def json(self) -> Any:
+        """Decode the body as JSON."""
+        return json.loads(self.text)
+
+
+class Transport:
+    """Base class for hub transports.
+
+    Subclasses implement ``_request``. The base class keeps request counts
+    and cumulative latency so runs can be compared.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the transport statistics."""
+        self._stats_lock = threading.Lock()
+        self.request_count = 0
+        self.total_elapsed = 0.0
+
+    def get(self, url: str, **kwargs: Any) -> Any:
+        """Issue a GET request."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> Any:
+        """Issue a POST request."""
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> Any:
+        """Issue a request and account for its latency."""
+        start = time.monotonic()
+        try:
+            return self._request(method, url, **kwargs)
+        finally:
+            elapsed = time.monotonic() - start
+            with self._stats_lock:
+                self.request_count += 1
+                self.total_elapsed += elapsed
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> Any:
+        """Perform the request."""
+        raise NotImplementedError
+
+    def stats(self) -> dict[str, float]:
+        """Return request count and latency totals."""
+        with self._stats_lock:
+            count = self.request_count
+            total = self.total_elapsed
+        return {
+            "requests": count,
+            "total_elapsed": total,
+            "mean_elapsed": total / count if count else 0.0,
+        }
+
+    def close(self) -> None:
+        """Release transport resources."""
+
+
+class RequestsTransport(Transport):
+    """Live transport backed by a ``requests.Session``."""
+
+    def __init__(self) -> None:
+        """Initialize the session."""
+        super().__init__()
+        import requests
+
+        self._session = requests.Session()
+        self._session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept-Language": "ko,en;q=0.9,en-US;q=0.8",
+        })
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> Any:
+        """Perform the request on the shared session."""
+        import requests
+
+        try:
+            return self._session.request(method, url, **kwargs)
+        except requests.RequestException as err:
+            raise TransportError(str(err)) from err
+
+    def close(self) -> None:
+        """Close the session."""
+        self._session.close()
+
+
+def _redact_form(body: str) -> str:
+    """Redact sensitive fields of an urlencoded body."""
+    pairs = parse_qsl(body, keep_blank_values=True)
+    return urlencode([
+        (key, REDACTED if key in SENSITIVE_FIELDS else value)
+        for key, value in pairs
+    ])
+
+
+def _redact_json(value: Any) -> Any:
+    """Redact sensitive fields of a JSON body."""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key in SENSITIVE_FIELDS else _redact_json(item)
+            for key, item in value.items()
+        }
+    return value
+
+
+def _path(url: str) -> str:
+    """Return the path and query of a URL, used as the cassette match key."""
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+
+def _postback_target(form: dict[str, str]) -> str:
+    """Return the ScriptManager target of a postback form, if any.
+
+    Panel refreshes and button presses post to the same page and only
+    differ in this field.
+    """
+    return form.get("ScriptManager1") or form.get("scriptmanager1") or ""
+
+
+class RecordingTransport(Transport):
+    """Transport that records every interaction of an inner transport."""
+
+    def __init__(self, inner: Transport) -> None:
+        """Initialize the recorder."""
+        super().__init__()
+        self._inner = inner
+        self._lock = threading.Lock()
+        self._interactions: list[dict[str, Any]] = []
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> Any:
+        """Forward the request and record it."""
+        request: dict[str, Any] = {"method": method, "path": _path(url)}
+        if "json" in kwargs:
+            request["json"] = _redact_json(kwargs["json"])
+        elif isinstance(kwargs.get("data"), dict):
+            request["data"] = _redact_form(urlencode(kwargs["data"]))
+
+        interaction: dict[str, Any] = {"request": request}
+        start = time.monotonic()
+        try:
+            response = self._inner.request(method, url, **kwargs)
+        except TransportError as err:
+            # Timeouts and connection errors are replayed too, after the
+            # same delay.
+            interaction["elapsed"] = round(time.monotonic() - start, 4)
+            interaction["error"] = str(err)
+            self._record(interaction)
+            raise
+        interaction["elapsed"] = round(time.monotonic() - start, 4)
+
+        text = response.text
+        if method == "POST" and "json" in kwargs:
+            # The login web service returns the token used in the postback.
+            text = json.dumps({"d": REDACTED})
+
+        interaction["response"] = {
+            "status_code": response.status_code,
+            "path": _path(response.url),
+            "text": text,
+        }
+        self._record(interaction)
+        return response
+
+    def _record(self, interaction: dict[str, Any]) -> None:
+        """Append an interaction to the cassette."""
+        with self._lock:
+            self._interactions.append(interaction)
+
+    def save(self, path: str) -> None:
+        """Write the redacted cassette to disk."""
+        with self._lock:
+            interactions = list(self._interactions)
+        with open(path, "w", encoding="utf-8") as cassette:
+            json.dump(
+                {"version": CASSETTE_VERSION, "interactions": interactions},
+                cassette,
+                ensure_ascii=False,
+                indent=1,
+            )
+        _LOGGER.info("Recorded %d interactions to %s", len(interactions), path)
+
+    def close(self) -> None:
+        """Close the inner transport."""
+        self._inner.close()
+
+
+class ReplayTransport(Transport):
+    """Transport that serves a recorded cassette offline.
+
+    Requests are matched on method, path and postback target. Recorded
+    responses for the same key are served in order, and recorded errors are
+    raised as ``TransportError``. ``time_scale`` multiplies the recorded
+    latency of each request, so 1.0 replays the original server latency and
+    0 replays as fast as possible. Only latency is replayed: the gaps
+    between requests are up to the client under test, which is what a
+    replay compares. Older cassettes may carry an ``offset`` per
+    interaction; it is ignored.
+    """
+
+    def __init__(self, path: str, time_scale: float = 1.0) -> None:
+        """Load the cassette."""
+        super().__init__()
+        with open(path, encoding="utf-8") as cassette:
+            data = json.load(cassette)
+        if data.get("version") not in SUPPORTED_CASSETTE_VERSIONS:
+            raise TransportError(f"Unsupported cassette version: {data.get('version')}")
+
+        self._time_scale = time_scale
+        self._lock = threading.Lock()
+        self._queues: dict[tuple[str, str, str], list[dict[str, Any]]] = {}
+        for interaction in data["interactions"]:
+            request = interaction["request"]
+            form = dict(parse_qsl(request.get("data", ""), keep_blank_values=True))
+            key = (request["method"], request["path"], _postback_target(form))
+            self._queues.setdefault(key, []).append(interaction)
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> TransportResponse:
+        """Serve the next recorded response for this request."""
+        data = kwargs.get("data")
+        target = _postback_target(data) if isinstance(data, dict) else ""
+        key = (method, _path(url), target)
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                raise CassetteMissError(
+                    f"No recorded response for {method} {key[1]} {target}".rstrip()
+                )
+            # Keep the last response around so steady-state polling can
+            # continue past the end of the recording.
+            interaction = queue.pop(0) if len(queue) > 1 else queue[0]
+
+        if self._time_scale > 0:
+            time.sleep(interaction["elapsed"] * self._time_scale)
+
+        if "error" in interaction:
+            raise TransportError(interaction["error"])
+
+        parts = urlsplit(url)
+        recorded = interaction["response"]
+        return TransportResponse(
+            recorded["status_code"],
+            f"{parts.scheme}://{parts.netloc}{recorded['path']}",
+            recorded["text"],
+        )
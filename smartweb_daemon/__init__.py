@@ -0,0 +1,5 @@
+"""Headless Postown SmartWeb poller publishing to MQTT.
+
+Runs ``SmartWebHub`` polling for many accounts outside of Home Assistant and
+bridges device state and commands to MQTT with Home Assistant discovery.
+"""
@@ -0,0 +1,4 @@
+"""Allow running the daemon with ``python -m smartweb_daemon``."""
+from .cli import main
+
+main()
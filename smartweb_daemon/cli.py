@@ -0,0 +1,46 @@
+"""Command line entry point for the SmartWeb poller daemon."""
+from __future__ import annotations
+
+import argparse
+import logging
+import signal
+import sys
+import threading
+
+from .config import ConfigError, load_config
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the daemon until interrupted."""
+    parser = argparse.ArgumentParser(
+        prog="smartweb-daemon",
+        description="Poll Postown SmartWeb accounts and publish them to MQTT.",
+    )
+    parser.add_argument("-c", "--config", required=True, help="path to the JSON config")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=args.log_level.upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    try:
+        config = load_config(args.config)
+    except ConfigError as err:
+        sys.exit(f"Invalid configuration: {err}")
+
+    from .daemon import PollerDaemon
+
+    daemon = PollerDaemon(config)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    daemon.start()
+    stop.wait()
+    daemon.stop()
+
+
+if __name__ == "__main__":
+    main()
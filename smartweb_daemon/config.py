@@ -0,0 +1,180 @@
+"""Configuration for the SmartWeb poller daemon."""
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field, fields
+from typing import Any
+
+from .shared import const
+
+_SLUG = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class ConfigError(ValueError):
+    """Raised when the daemon configuration is invalid."""
+
+
+@dataclass
+class MqttConfig:
+    """MQTT broker connection settings."""
+
+    host: str = "localhost"
+    port: int = 1883
+    username: str | None = None
+    password: str | None = None
+    client_id: str = "smartweb-daemon"
+    base_topic: str = "smartweb"
+    discovery_prefix: str = "homeassistant"
+
+
+@dataclass
+class DeviceConfig:
+    """A device polled for an account."""
+
+    name: str
+    type: str
+    id: str
+
+
+@dataclass
+class AccountConfig:
+    """A SmartWeb account and its devices."""
+
+    name: str
+    host: str
+    username: str
+    password: str
+    devices: list[DeviceConfig] = field(default_factory=list)
+
+
+@dataclass
+class DaemonConfig:
+    """Top-level daemon configuration."""
+
+    mqtt: MqttConfig
+    accounts: list[AccountConfig]
+    scan_interval: float = const.DEFAULT_SCAN_INTERVAL
+    workers: int = 4
+    hedge_reads: bool = False
+    poll_mode: str = const.POLL_MODE_AUTO
+    # Worker processes for page parsing; 0 parses in the polling threads.
+    parse_workers: int = 0
+
+
+def _require(data: dict, key: str, where: str) -> str:
+    """Return a required string value."""
+    value = data.get(key)
+    if value is None or value == "":
+        raise ConfigError(f"{where}: missing '{key}'")
+    return str(value)
+
+
+def _number(data: dict, key: str, default: Any, kind: type, where: str = "") -> Any:
+    """Return a numeric value converted to ``kind``."""
+    value = data.get(key, default)
+    try:
+        return kind(value)
+    except (TypeError, ValueError) as err:
+        prefix = f"{where}: " if where else ""
+        raise ConfigError(f"{prefix}invalid {key} {value!r}") from err
+
+
+def _objects(data: dict, key: str, where: str) -> list[dict]:
+    """Return a list of objects, checking its shape."""
+    value = data.get(key, [])
+    if not isinstance(value, list):
+        raise ConfigError(f"{where}{key} must be a list")
+    for index, item in enumerate(value):
+        if not isinstance(item, dict):
+            raise ConfigError(f"{where}{key}[{index}] must be an object")
+    return value
+
+
+def _parse_mqtt(data: Any) -> MqttConfig:
+    """Validate the MQTT section."""
+    if not isinstance(data, dict):
+        raise ConfigError("mqtt must be an object")
+    unknown = sorted(set(data) - {item.name for item in fields(MqttConfig)})
+    if unknown:
+        raise ConfigError(f"mqtt: unknown option(s) {', '.join(unknown)}")
+    options = dict(data)
+    if "port" in options:
+        options["port"] = _number(options, "port", None, int, "mqtt")
+    return MqttConfig(**options)
+
+
+def parse_config(data: Any) -> DaemonConfig:
+    """Validate a configuration dictionary."""
+    if not isinstance(data, dict):
+        raise ConfigError("configuration must be an object")
+    mqtt = _parse_mqtt(data.get("mqtt", {}))
+
+    accounts = []
+    names = set()
+    for index, raw in enumerate(_objects(data, "accounts", "")):
+        where = f"accounts[{index}]"
+        name = _require(raw, "name", where)
+        if not _SLUG.match(name):
+            raise ConfigError(f"{where}: name may only use letters, digits, '_' and '-'")
+        if name in names:
+            raise ConfigError(f"{where}: duplicate account name '{name}'")
+        names.add(name)
+
+        devices = []
+        for device_index, device in enumerate(_objects(raw, "devices", f"{where}.")):
+            device_where = f"{where}.devices[{device_index}]"
+            device_type = _require(device, "type", device_where)
+            if device_type not in (const.DEVICE_TYPE_LIGHT, const.DEVICE_TYPE_HEATER):
+                raise ConfigError(f"{device_where}: unknown type '{device_type}'")
+            device_id = _require(device, "id", device_where)
+            devices.append(DeviceConfig(
+                name=device.get("name") or f"{device_type} {device_id}",
+                type=device_type,
+                id=device_id,
+            ))
+
+        accounts.append(AccountConfig(
+            name=name,
+            host=_require(raw, "host", where).rstrip("/"),
+            username=_require(raw, "username", where),
+            password=_require(raw, "password", where),
+            devices=devices,
+        ))
+
+    if not accounts:
+        raise ConfigError("no accounts configured")
+
+    scan_interval = _number(data, "scan_interval", const.DEFAULT_SCAN_INTERVAL, float)
+    workers = _number(data, "workers", 4, int)
+    if scan_interval <= 0 or workers <= 0:
+        raise ConfigError("scan_interval and workers must be positive")
+    poll_mode = data.get("poll_mode", const.POLL_MODE_AUTO)
+    if poll_mode not in (const.POLL_MODE_AUTO, const.POLL_MODE_DELTA, const.POLL_MODE_FULL):
+        raise ConfigError(f"unknown poll_mode '{poll_mode}'")
+    parse_workers = _number(data, "parse_workers", 0, int)
+    if parse_workers < 0:
+        raise ConfigError("parse_workers must not be negative")
+    hedge_reads = data.get("hedge_reads", False)
+    if not isinstance(hedge_reads, bool):
+        raise ConfigError(f"invalid hedge_reads {hedge_reads!r}, expected true or false")
+
+    return DaemonConfig(
+        mqtt=mqtt,
+        accounts=accounts,
+        scan_interval=scan_interval,
+        workers=workers,
+        hedge_reads=hedge_reads,
+        poll_mode=poll_mode,
+        parse_workers=parse_workers,
+    )
+
+
+def load_config(path: str) -> DaemonConfig:
+    """Load and validate a JSON configuration file."""
+    try:
+        with open(path, encoding="utf-8") as config_file:
+            data = json.load(config_file)
+    except (OSError, ValueError) as err:
+        raise ConfigError(f"cannot read {path}: {err}") from err
+    return parse_config(data)
@@ -0,0 +1,361 @@
+"""SmartWeb poller daemon."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any
+
+from .config import AccountConfig, DaemonConfig, DeviceConfig
+from .gather import ParseGatherer
+from .mqtt import OFFLINE, ONLINE, MqttBridge
+from .scheduler import Scheduler
+from .shared import ParsePool, SmartWebHub, const, pages
+
+_LOGGER = logging.getLogger(__name__)
+
+MIN_TEMP = 10
+MAX_TEMP = 40
+
+
+class Account:
+    """Runtime state of one configured account."""
+
+    def __init__(
+        self,
+        config: AccountConfig,
+        hedge_reads: bool,
+        poll_mode: str,
+    ) -> None:
+        """Initialize the account and its hub."""
+        self.config = config
+        self.name = config.name
+        self.hub = SmartWebHub(
+            config.host,
+            config.username,
+            config.password,
+            hedge_reads=hedge_reads,
+            poll_mode=poll_mode,
+        )
+        self.devices = {(device.type, device.id): device for device in config.devices}
+        self.states: dict[tuple[str, str], dict[str, Any]] = {}
+        self.available: bool | None = None
+        # Polls and commands share one server session; run them one at a time.
+        self.lock = threading.Lock()
+
+
+class PollerDaemon:
+    """Polls SmartWeb accounts and bridges them to MQTT."""
+
+    def __init__(self, config: DaemonConfig) -> None:
+        """Initialize the daemon."""
+        self._config = config
+        self._base = config.mqtt.base_topic
+        # One pool serves every account, so parsing never holds the GIL
+        # that the polling threads and the MQTT client share.
+        self._parse_pool = (
+            ParsePool(config.parse_workers) if config.parse_workers else None
+        )
+        if self._parse_pool is not None and config.poll_mode != const.POLL_MODE_FULL:
+            _LOGGER.warning(
+                "parse_workers only helps with poll_mode \"full\"; UpdatePanel "
+                "fragments are parsed in the polling threads"
+            )
+        self._accounts = {
+            account.name: Account(account, config.hedge_reads, config.poll_mode)
+            for account in config.accounts
+        }
+        self._scheduler = Scheduler(config.workers)
+        self._mqtt = MqttBridge(config.mqtt, self._handle_command, self._handle_connected)
+
+    def _topic(self, account: Account, device: DeviceConfig, *parts: str) -> str:
+        """Return a topic below a device."""
+        return "/".join((self._base, account.name, device.type, device.id, *parts))
+
+    def _availability_topic(self, account: Account) -> str:
+        """Return the availability topic of an account."""
+        return f"{self._base}/{account.name}/availability"
+
+    def _discovery(self, account: Account, device: DeviceConfig) -> tuple[str, dict]:
+        """Build the Home Assistant discovery topic and config of a device."""
+        unique_id = f"smartweb_{account.name}_{device.type}_{device.id}"
+        state_topic = self._topic(account, device, "state")
+        config: dict[str, Any] = {
+            "name": device.name,
+            "unique_id": unique_id,
+            "availability": [
+                {"topic": self._mqtt.status_topic},
+                {"topic": self._availability_topic(account)},
+            ],
+            "availability_mode": "all",
+            "device": {
+                "identifiers": [f"smartweb_{account.name}"],
+                "name": f"SmartWeb {account.name}",
+                "manufacturer": "Postown",
+                "model": "SmartWeb",
+            },
+        }
+
+        if device.type == const.DEVICE_TYPE_LIGHT:
+            component = "switch"
+            config.update({
+                "state_topic": state_topic,
+                "value_template": "{{ 'ON' if value_json.is_on else 'OFF' }}",
+                "command_topic": self._topic(account, device, "set"),
+                "payload_on": "ON",
+                "payload_off": "OFF",
+            })
+        else:
+            component = "climate"
+            config.update({
+                "modes": [pages.HVAC_HEAT, pages.HVAC_OFF],
+                "mode_state_topic": state_topic,
+                "mode_state_template": "{{ value_json.hvac_mode }}",
+                "mode_command_topic": self._topic(account, device, "mode", "set"),
+                "preset_modes": [pages.PRESET_HOME, pages.PRESET_AWAY],
+                "preset_mode_state_topic": state_topic,
+                "preset_mode_value_template": "{{ value_json.preset_mode }}",
+                "preset_mode_command_topic": self._topic(account, device, "preset", "set"),
+                "temperature_state_topic": state_topic,
+                "temperature_state_template": "{{ value_json.target_temperature }}",
+                "temperature_command_topic": self._topic(account, device, "temperature", "set"),
+                "current_temperature_topic": state_topic,
+                "current_temperature_template": "{{ value_json.target_temperature }}",
+                "min_temp": MIN_TEMP,
+                "max_temp": MAX_TEMP,
+                "temp_step": 1,
+                "temperature_unit": "C",
+            })
+
+        prefix = self._config.mqtt.discovery_prefix
+        return f"{prefix}/{component}/{unique_id}/config", config
+
+    def _handle_connected(self) -> None:
+        """Publish discovery and the last known states after (re)connecting."""
+        for account in self._accounts.values():
+            for device in account.devices.values():
+                topic, config = self._discovery(account, device)
+                self._mqtt.publish(topic, config)
+                state = account.states.get((device.type, device.id))
+                if state is not None:
+                    self._mqtt.publish(self._topic(account, device, "state"), state)
+            if account.available is not None:
+                self._mqtt.publish(
+                    self._availability_topic(account),
+                    ONLINE if account.available else OFFLINE,
+                )
+
+    def _set_available(self, account: Account, available: bool) -> None:
+        """Publish account availability when it changes."""
+        if account.available != available:
+            account.available = available
+            self._mqtt.publish(
+                self._availability_topic(account), ONLINE if available else OFFLINE
+            )
+
+    def _publish_state(
+        self, account: Account, device: DeviceConfig, state: dict[str, Any] | None
+    ) -> bool:
+        """Publish a polled device state if it changed."""
+        key = (device.type, device.id)
+        if state is None:
+            return False
+        if account.states.get(key) != state:
+            account.states[key] = state
+            self._mqtt.publish(self._topic(account, device, "state"), state)
+        return True
+
+    def _publish_account(
+        self, account: Account, states: dict[tuple[str, str], dict[str, Any] | None]
+    ) -> None:
+        """Publish the polled states and availability of an account."""
+        results = [
+            self._publish_state(account, device, states.get(key))
+            for key, device in account.devices.items()
+        ]
+        self._set_available(account, any(results))
+
+    def poll_account(self, account: Account, gatherer: ParseGatherer | None = None) -> None:
+        """Poll every device of an account.
+
+        With a gatherer, full pages are parsed in the pool together with
+        the rest of the account's poll group. The account lock is released
+        while they are parsed, so commands are not held up by other
+        accounts.
+        """
+        if gatherer is None:
+            with account.lock:
+                self._drain(account)
+                states = account.hub.poll_devices(list(account.devices))
+                self._publish_account(account, states)
+            return
+
+        with account.lock:
+            self._drain(account)
+            states, pages = account.hub.fetch_pages(list(account.devices))
+        results = gatherer.parse([job for _, job in pages])
+        with account.lock:
+            states.update(
+                account.hub.store_pages([(key, result) for (key, _), result in zip(pages, results)])
+            )
+            self._publish_account(account, states)
+
+    def _poll_groups(self) -> list[list[Account]]:
+        """Group accounts so each poll gives the parse pool full batches."""
+        accounts = list(self._accounts.values())
+        if self._parse_pool is None:
+            return [[account] for account in accounts]
+
+        groups: list[list[Account]] = []
+        group: list[Account] = []
+        devices = 0
+        for account in accounts:
+            group.append(account)
+            devices += len(account.devices)
+            if devices >= self._parse_pool.capacity:
+                groups.append(group)
+                group, devices = [], 0
+        if group:
+            groups.append(group)
+        return groups
+
+    def _command_desired(
+        self, device_type: str, field: str, value: str
+    ) -> dict[str, Any]:
+        """Map a command message to the desired state it asks for."""
+        value = value.strip().lower()
+        if device_type == const.DEVICE_TYPE_LIGHT:
+            if value in ("on", "off"):
+                return {"is_on": value == "on"}
+        elif field == "mode":
+            if value == pages.HVAC_HEAT:
+                return {"hvac_mode": pages.HVAC_HEAT, "preset_mode": pages.PRESET_HOME}
+            if value == pages.HVAC_OFF:
+                return {"hvac_mode": pages.HVAC_OFF, "preset_mode": None}
+        elif field == "preset":
+            if value in (pages.PRESET_HOME, pages.PRESET_AWAY):
+                return {"hvac_mode": pages.HVAC_HEAT, "preset_mode": value}
+        elif field == "temperature":
+            try:
+                temperature = float(value)
+            except ValueError:
+                pass
+            else:
+                return {"target_temperature": min(MAX_TEMP, max(MIN_TEMP, temperature))}
+        raise ValueError(f"unsupported {device_type} command {field}={value}")
+
+    def _drain(self, account: Account) -> None:
+        """Apply the account's due commands; the account lock must be held.
+
+        Commands that fail stay in the outbox with a backoff and are picked
+        up again by a later drain, at the latest with the next poll.
+        """
+        hub = account.hub
+        outbox = hub.outbox
+        for key, desired, seq in outbox.due(time.time()):
+            try:
+                ok = hub.apply_desired(key[0], key[1], desired)
+            except Exception:
+                _LOGGER.exception("Unexpected error sending %s %s", *key)
+                ok = False
+
+            if ok:
+                outbox.complete(key, seq)
+            else:
+                delay = outbox.retry_later(key, seq, time.time())
+                _LOGGER.warning(
+                    "Command for %s/%s %s not applied, retrying in %.0fs",
+                    account.name, key[0], key[1], delay,
+                )
+            cached = hub.cache.get(key)
+            if cached is not None:
+                self._publish_state(account, account.devices[key], cached.state)
+
+    def drain_account(self, account: Account) -> None:
+        """Apply the account's due commands."""
+        with account.lock:
+            self._drain(account)
+
+    def _handle_command(self, topic: str, payload: str) -> None:
+        """Route a command message to the right device."""
+        parts = topic[len(self._base) + 1:].split("/")
+        # <account>/<type>/<id>/set or <account>/heater/<id>/<field>/set
+        if parts[-1] != "set":
+            # Not every broker keeps our own state topics out of the wildcards.
+            return
+        if len(parts) == 4:
+            account_name, device_type, device_id, _ = parts
+            field = "state"
+        elif len(parts) == 5 and parts[1] == const.DEVICE_TYPE_HEATER:
+            account_name, device_type, device_id, field, _ = parts
+        else:
+            return
+
+        account = self._accounts.get(account_name)
+        device = account.devices.get((device_type, device_id)) if account else None
+        if device is None:
+            _LOGGER.debug("Ignoring command for unknown device on %s", topic)
+            return
+
+        try:
+            desired = self._command_desired(device.type, field, payload)
+        except ValueError as err:
+            _LOGGER.warning("Ignoring command on %s: %s", topic, err)
+            return
+
+        # Queued commands for a device are merged, and every drain sends the
+        # latest desired state, so commands cannot overtake each other while
+        # they wait for the account lock.
+        account.hub.outbox.put(device.type, device.id, desired)
+        self._scheduler.submit(self.drain_account, account)
+
+    def start(self) -> None:
+        """Connect to MQTT and start polling."""
+        if self._parse_pool is not None:
+            self._parse_pool.start()
+        self._mqtt.start()
+        interval = self._config.scan_interval
+        count = len(self._accounts)
+        # Spread polls evenly over the interval instead of polling in bursts.
+        # The accounts of a group are due together, so their pages can share
+        # one parse pool submission.
+        groups = self._poll_groups()
+        for index, group in enumerate(groups):
+            offset = interval * index / len(groups)
+            gatherer = (
+                ParseGatherer(self._parse_pool, len(group))
+                if self._parse_pool is not None
+                else None
+            )
+            for account in group:
+                self._scheduler.every(
+                    interval,
+                    lambda a=account, g=gatherer: self.poll_account(a, g),
+                    offset,
+                    f"poll {account.name}",
+                )
+        for index, account in enumerate(self._accounts.values()):
+            offset = interval * index / count
+            self._scheduler.every(
+                const.KEEPALIVE_INTERVAL, account.hub.keepalive, const.KEEPALIVE_INTERVAL + offset,
+                f"keepalive {account.name}",
+            )
+        self._scheduler.start()
+        _LOGGER.info("Polling %d accounts every %.0fs", count, interval)
+
+    def stop(self) -> None:
+        """Disconnect and stop polling.
+
+        MQTT goes first so no command arrives once the scheduler is stopped.
+        Hubs and the parse pool are closed whatever happens before.
+        """
+        try:
+            self._mqtt.stop()
+        finally:
+            try:
+                self._scheduler.stop()
+            finally:
+                for account in self._accounts.values():
+                    account.hub.close()
+                if self._parse_pool is not None:
+                    self._parse_pool.close()
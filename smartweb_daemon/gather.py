@@ -0,0 +1,74 @@
+"""Gathers the pages of several accounts into one parse pool submission."""
+from __future__ import annotations
+
+import threading
+import time
+
+from .shared import ParsePool
+
+# How long the first account of a poll group waits for the others.
+GATHER_WINDOW = 2.0
+
+
+class _Round:
+    """The pages handed in for one submission."""
+
+    def __init__(self) -> None:
+        """Initialize the round."""
+        self.jobs: list = []
+        self.arrived = 0
+        self.closed = False
+        self.results: list | None = None
+
+
+class ParseGatherer:
+    """Parses the pages of a poll group's accounts in one pool call.
+
+    The accounts of a group are fetched in parallel on the scheduler's
+    workers. The first to finish waits up to ``window`` seconds for the
+    rest, submits every page at once and hands each account its results;
+    accounts arriving later start the next round.
+    """
+
+    def __init__(self, pool: ParsePool, size: int, window: float = GATHER_WINDOW) -> None:
+        """Initialize the gatherer for a group of ``size`` accounts."""
+        self._pool = pool
+        self._size = size
+        self._window = window
+        self._cond = threading.Condition()
+        self._round: _Round | None = None
+
+    def parse(self, jobs: list) -> list:
+        """Parse an account's pages together with the rest of its group."""
+        with self._cond:
+            round_ = self._round
+            leader = round_ is None or round_.closed
+            if leader:
+                round_ = self._round = _Round()
+            start = len(round_.jobs)
+            round_.jobs.extend(jobs)
+            round_.arrived += 1
+            self._cond.notify_all()
+
+            if not leader:
+                while round_.results is None:
+                    self._cond.wait()
+                return round_.results[start:start + len(jobs)]
+
+            deadline = time.monotonic() + self._window
+            while round_.arrived < self._size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            round_.closed = True
+            all_jobs = list(round_.jobs)
+
+        results: list = [None] * len(all_jobs)
+        try:
+            results = self._pool.parse(all_jobs)
+        finally:
+            with self._cond:
+                round_.results = results
+                self._cond.notify_all()
+        return results[start:start + len(jobs)]
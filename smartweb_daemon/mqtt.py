@@ -0,0 +1,89 @@
+"""MQTT bridge for the SmartWeb poller daemon."""
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Callable
+from typing import Any
+
+import paho.mqtt.client as mqtt
+
+from .config import MqttConfig
+
+_LOGGER = logging.getLogger(__name__)
+
+ONLINE = "online"
+OFFLINE = "offline"
+
+
+class MqttBridge:
+    """Publishes state and discovery and dispatches command messages."""
+
+    def __init__(
+        self,
+        config: MqttConfig,
+        on_command: Callable[[str, str], None],
+        on_connected: Callable[[], None],
+    ) -> None:
+        """Initialize the bridge."""
+        self._config = config
+        self._on_command = on_command
+        self._on_connected = on_connected
+        self.status_topic = f"{config.base_topic}/status"
+
+        self._client = mqtt.Client(
+            mqtt.CallbackAPIVersion.VERSION2, client_id=config.client_id
+        )
+        if config.username:
+            self._client.username_pw_set(config.username, config.password)
+        self._client.will_set(self.status_topic, OFFLINE, qos=1, retain=True)
+        self._client.on_connect = self._handle_connect
+        self._client.on_message = self._handle_message
+
+    def _handle_connect(self, client, userdata, flags, reason_code, properties) -> None:
+        """Subscribe to command topics and announce the daemon."""
+        if reason_code.is_failure:
+            _LOGGER.error("MQTT connection refused: %s", reason_code)
+            return
+        _LOGGER.info("Connected to MQTT broker %s:%s", self._config.host, self._config.port)
+        base = self._config.base_topic
+        # <base>/<account>/light/<id>/set and <base>/<account>/heater/<id>/<field>/set
+        client.subscribe([(f"{base}/+/+/+/set", 1), (f"{base}/+/+/+/+/set", 1)])
+        client.publish(self.status_topic, ONLINE, qos=1, retain=True)
+        self._on_connected()
+
+    def _handle_message(self, client, userdata, message) -> None:
+        """Dispatch a command message."""
+        try:
+            payload = message.payload.decode("utf-8").strip()
+        except UnicodeDecodeError:
+            _LOGGER.warning("Ignoring non UTF-8 payload on %s", message.topic)
+            return
+        self._on_command(message.topic, payload)
+
+    def publish(self, topic: str, payload: Any, retain: bool = True) -> None:
+        """Publish a string or JSON payload."""
+        if not isinstance(payload, str):
+            payload = json.dumps(payload, ensure_ascii=False)
+        self._client.publish(topic, payload, qos=1, retain=retain)
+
+    def start(self) -> None:
+        """Connect in the background, reconnecting automatically."""
+        self._client.reconnect_delay_set(min_delay=1, max_delay=60)
+        self._client.connect_async(self._config.host, self._config.port)
+        self._client.loop_start()
+
+    def stop(self) -> None:
+        """Announce shutdown and disconnect.
+
+        The offline status is only awaited when the client could send it;
+        with the broker unreachable there is nothing to wait for.
+        """
+        info = self._client.publish(self.status_topic, OFFLINE, qos=1, retain=True)
+        if info.rc == mqtt.MQTT_ERR_SUCCESS:
+            try:
+                info.wait_for_publish(5)
+            except (RuntimeError, ValueError) as err:
+                _LOGGER.warning("Could not publish offline status: %s", err)
+        self._client.disconnect()
+        self._client.loop_stop()
@@ -0,0 +1,109 @@
+"""Shared poll scheduler for the SmartWeb poller daemon."""
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Scheduler:
+    """Runs periodic jobs for all accounts on one timer and a worker pool.
+
+    A single thread keeps a heap of due times and hands due jobs to a small
+    thread pool, so hundreds of accounts do not need a thread each. A job is
+    only rescheduled after it finishes, so a slow server cannot pile up
+    overlapping polls for the same account.
+    """
+
+    def __init__(self, workers: int) -> None:
+        """Initialize the scheduler."""
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="smartweb_worker"
+        )
+        self._heap: list[tuple[float, int, float, Callable[[], None], str]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: threading.Thread | None = None
+
+    def every(
+        self,
+        interval: float,
+        func: Callable[[], None],
+        offset: float = 0.0,
+        name: str = "",
+    ) -> None:
+        """Run ``func`` every ``interval`` seconds, first after ``offset``."""
+        self._push(time.monotonic() + offset, interval, func, name)
+
+    def submit(self, func: Callable[..., None], *args) -> None:
+        """Run a one-off task on the worker pool; dropped once stopped."""
+        name = getattr(func, "__name__", "")
+        with self._cond:
+            if self._stopped:
+                _LOGGER.debug("Dropping task %s submitted after stop", name)
+                return
+            self._executor.submit(self._run, func, name=name, args=args)
+
+    def _push(
+        self, due: float, interval: float, func: Callable[[], None], name: str
+    ) -> None:
+        """Add a job to the heap and wake the timer thread."""
+        with self._cond:
+            heapq.heappush(self._heap, (due, next(self._seq), interval, func, name))
+            self._cond.notify()
+
+    @staticmethod
+    def _run(func: Callable[..., None], name: str, args: tuple = ()) -> None:
+        """Run a task, logging instead of propagating errors."""
+        try:
+            func(*args)
+        except Exception:
+            _LOGGER.exception("Task %s failed", name)
+
+    def _run_periodic(
+        self, due: float, interval: float, func: Callable[[], None], name: str
+    ) -> None:
+        """Run a periodic job and schedule its next run."""
+        self._run(func, name)
+        # Keep the original cadence, but never schedule into the past.
+        next_due = max(due + interval, time.monotonic())
+        if not self._stopped:
+            self._push(next_due, interval, func, name)
+
+    def _loop(self) -> None:
+        """Hand due jobs to the worker pool."""
+        with self._cond:
+            while not self._stopped:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due = self._heap[0][0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                due, _, interval, func, name = heapq.heappop(self._heap)
+                self._executor.submit(self._run_periodic, due, interval, func, name)
+
+    def start(self) -> None:
+        """Start the timer thread."""
+        self._thread = threading.Thread(
+            target=self._loop, name="smartweb_scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop scheduling and wait for running jobs."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,20 @@
+"""Integration modules the daemon shares with the Home Assistant component.
+
+Installed, they ship inside this package as ``smartweb_daemon.postown_smartweb``
+so nothing is added to Home Assistant's ``custom_components`` namespace. In a
+source checkout they are imported from ``custom_components`` directly.
+"""
+from __future__ import annotations
+
+try:
+    from .postown_smartweb import const, pages
+    from .postown_smartweb.hub import SmartWebHub
+    from .postown_smartweb.parse_pool import ParsePool
+except ModuleNotFoundError as err:
+    if err.name != f"{__package__}.postown_smartweb":
+        raise
+    from custom_components.postown_smartweb import const, pages
+    from custom_components.postown_smartweb.hub import SmartWebHub
+    from custom_components.postown_smartweb.parse_pool import ParsePool
+
+__all__ = ["ParsePool", "SmartWebHub", "const", "pages"]
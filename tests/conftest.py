@@ -0,0 +1,65 @@
+"""Shared test fixtures and helpers."""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from custom_components.postown_smartweb import hub as hub_module
+from custom_components.postown_smartweb.transport import Transport, TransportResponse
+
+
+def delta(*entries: tuple[str, str, str]) -> str:
+    """Render entries in the ASP.NET partial rendering format."""
+    return "".join(f"{len(content)}|{kind}|{ident}|{content}|" for kind, ident, content in entries)
+
+
+class Delayed:
+    """A scripted response that arrives after a delay."""
+
+    def __init__(self, seconds: float, response: Any) -> None:
+        self.seconds = seconds
+        self.response = response
+
+
+class ScriptedTransport(Transport):
+    """Answers each request with the next scripted response.
+
+    A response is a ``(status, text)`` pair, an exception to raise, or
+    either of them wrapped in ``Delayed``.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.responses: list[Any] = []
+        self._script_lock = threading.Lock()
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> Any:
+        with self._script_lock:
+            response = self.responses.pop(0)
+        if isinstance(response, Delayed):
+            time.sleep(response.seconds)
+            response = response.response
+        if isinstance(response, Exception):
+            raise response
+        status, text = response
+        return TransportResponse(status, url, text)
+
+
+class Clock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(hub_module.time, "monotonic", clock)
+    return clock
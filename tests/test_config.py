@@ -0,0 +1,90 @@
+"""Tests for the daemon configuration."""
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from smartweb_daemon.config import ConfigError, parse_config
+
+
+def config(**overrides: Any) -> dict[str, Any]:
+    """Return a valid configuration with some options replaced."""
+    data: dict[str, Any] = {
+        "mqtt": {"host": "broker", "port": "1884"},
+        "accounts": [
+            {
+                "name": "home",
+                "host": "http://smartweb.invalid/",
+                "username": "user",
+                "password": "pass",
+                "devices": [{"type": "light", "id": "1"}, {"type": "heater", "id": "31"}],
+            }
+        ],
+    }
+    data.update(overrides)
+    return data
+
+
+def test_valid_config() -> None:
+    parsed = parse_config(config(scan_interval="15", workers=2, poll_mode="full"))
+    assert parsed.mqtt.port == 1884
+    assert parsed.scan_interval == 15.0
+    assert parsed.workers == 2
+    assert parsed.poll_mode == "full"
+    [account] = parsed.accounts
+    assert account.host == "http://smartweb.invalid"
+    assert [device.name for device in account.devices] == ["light 1", "heater 31"]
+
+
+@pytest.mark.parametrize(
+    ("overrides", "message"),
+    [
+        ({"workers": "four"}, "invalid workers"),
+        ({"scan_interval": None}, "invalid scan_interval"),
+        ({"parse_workers": [2]}, "invalid parse_workers"),
+        ({"workers": 0}, "must be positive"),
+        ({"parse_workers": -1}, "must not be negative"),
+        ({"hedge_reads": "false"}, "invalid hedge_reads"),
+        ({"poll_mode": "fast"}, "unknown poll_mode"),
+        ({"mqtt": {"port": "mqtt"}}, "mqtt: invalid port"),
+        ({"mqtt": {"hostname": "broker"}}, "unknown option"),
+        ({"mqtt": "broker"}, "mqtt must be an object"),
+        ({"accounts": {"name": "home"}}, "accounts must be a list"),
+        ({"accounts": ["home"]}, r"accounts\[0\] must be an object"),
+        ({"accounts": []}, "no accounts configured"),
+    ],
+)
+def test_invalid_options(overrides: dict[str, Any], message: str) -> None:
+    with pytest.raises(ConfigError, match=message):
+        parse_config(config(**overrides))
+
+
+@pytest.mark.parametrize(
+    ("account", "message"),
+    [
+        ({"name": "my home"}, "name may only use"),
+        ({"password": ""}, "missing 'password'"),
+        ({"devices": {"type": "light"}}, r"accounts\[0\]\.devices must be a list"),
+        ({"devices": ["light"]}, r"devices\[0\] must be an object"),
+        ({"devices": [{"type": "fan", "id": "1"}]}, "unknown type 'fan'"),
+        ({"devices": [{"type": "light"}]}, "missing 'id'"),
+    ],
+)
+def test_invalid_accounts(account: dict[str, Any], message: str) -> None:
+    data = config()
+    data["accounts"][0].update(account)
+    with pytest.raises(ConfigError, match=message):
+        parse_config(data)
+
+
+def test_duplicate_account_names() -> None:
+    data = config()
+    data["accounts"].append(dict(data["accounts"][0]))
+    with pytest.raises(ConfigError, match="duplicate account name"):
+        parse_config(data)
+
+
+def test_configuration_must_be_an_object() -> None:
+    with pytest.raises(ConfigError, match="must be an object"):
+        parse_config([])
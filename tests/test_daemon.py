@@ -0,0 +1,114 @@
+"""Tests for routing MQTT commands in the daemon."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from smartweb_daemon.config import parse_config
+from smartweb_daemon.daemon import MAX_TEMP, MIN_TEMP, PollerDaemon
+
+
+class RecordingScheduler:
+    """Scheduler stand-in that records submitted tasks."""
+
+    def __init__(self) -> None:
+        self.tasks: list[tuple[Any, tuple]] = []
+
+    def submit(self, func: Any, *args: Any) -> None:
+        self.tasks.append((func, args))
+
+
+@pytest.fixture
+def daemon() -> Iterator[PollerDaemon]:
+    daemon = PollerDaemon(parse_config({
+        "accounts": [{
+            "name": "home",
+            "host": "http://smartweb.invalid",
+            "username": "user",
+            "password": "pass",
+            "devices": [{"type": "light", "id": "1"}, {"type": "heater", "id": "31"}],
+        }],
+    }))
+    daemon._scheduler = RecordingScheduler()
+    yield daemon
+    daemon._accounts["home"].hub.close()
+
+
+def pending(daemon: PollerDaemon, device_type: str, device_id: str) -> dict | None:
+    return daemon._accounts["home"].hub.outbox.pending((device_type, device_id))
+
+
+@pytest.mark.parametrize(
+    ("topic", "payload", "key", "desired"),
+    [
+        ("smartweb/home/light/1/set", "ON", ("light", "1"), {"is_on": True}),
+        ("smartweb/home/light/1/set", " off ", ("light", "1"), {"is_on": False}),
+        (
+            "smartweb/home/heater/31/mode/set", "heat", ("heater", "31"),
+            {"hvac_mode": "heat", "preset_mode": "home"},
+        ),
+        (
+            "smartweb/home/heater/31/mode/set", "off", ("heater", "31"),
+            {"hvac_mode": "off", "preset_mode": None},
+        ),
+        (
+            "smartweb/home/heater/31/preset/set", "away", ("heater", "31"),
+            {"hvac_mode": "heat", "preset_mode": "away"},
+        ),
+        (
+            "smartweb/home/heater/31/temperature/set", "22.5", ("heater", "31"),
+            {"target_temperature": 22.5},
+        ),
+        (
+            "smartweb/home/heater/31/temperature/set", "99", ("heater", "31"),
+            {"target_temperature": MAX_TEMP},
+        ),
+        (
+            "smartweb/home/heater/31/temperature/set", "-5", ("heater", "31"),
+            {"target_temperature": MIN_TEMP},
+        ),
+    ],
+)
+def test_commands_are_queued(
+    daemon: PollerDaemon, topic: str, payload: str, key: tuple[str, str], desired: dict
+) -> None:
+    daemon._handle_command(topic, payload)
+    assert pending(daemon, *key) == desired
+    [(func, args)] = daemon._scheduler.tasks
+    assert func == daemon.drain_account
+    assert args == (daemon._accounts["home"],)
+
+
+@pytest.mark.parametrize(
+    ("topic", "payload"),
+    [
+        ("smartweb/home/light/1/set", "toggle"),
+        ("smartweb/home/light/1/state", "ON"),
+        ("smartweb/home/light/2/set", "ON"),
+        ("smartweb/away/light/1/set", "ON"),
+        ("smartweb/home/light/1/mode/set", "heat"),
+        ("smartweb/home/heater/31/set", "ON"),
+        ("smartweb/home/heater/31/mode/set", "cool"),
+        ("smartweb/home/heater/31/preset/set", "eco"),
+        ("smartweb/home/heater/31/temperature/set", "warm"),
+        ("smartweb/home/heater/31/fan/set", "on"),
+    ],
+)
+def test_other_messages_are_ignored(daemon: PollerDaemon, topic: str, payload: str) -> None:
+    daemon._handle_command(topic, payload)
+    assert pending(daemon, "light", "1") is None
+    assert pending(daemon, "heater", "31") is None
+    assert daemon._scheduler.tasks == []
+
+
+def test_commands_for_a_device_are_merged(daemon: PollerDaemon) -> None:
+    daemon._handle_command("smartweb/home/heater/31/temperature/set", "27")
+    daemon._handle_command("smartweb/home/heater/31/preset/set", "away")
+    daemon._handle_command("smartweb/home/heater/31/temperature/set", "22")
+    assert pending(daemon, "heater", "31") == {
+        "hvac_mode": "heat",
+        "preset_mode": "away",
+        "target_temperature": 22.0,
+    }
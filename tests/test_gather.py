@@ -0,0 +1,53 @@
+"""Tests for gathering the pages of a poll group."""
+from __future__ import annotations
+
+import threading
+
+from smartweb_daemon.gather import ParseGatherer
+
+
+class RecordingPool:
+    """Parse pool stand-in that echoes its jobs and records each call."""
+
+    def __init__(self) -> None:
+        self.calls: list[list] = []
+
+    def parse(self, jobs: list) -> list:
+        self.calls.append(list(jobs))
+        return [f"parsed {job}" for job in jobs]
+
+
+def run_accounts(gatherer: ParseGatherer, jobs: list[list]) -> list[list]:
+    """Hand each job list in from its own thread, as account polls do."""
+    results: list[list] = [[] for _ in jobs]
+
+    def poll(index: int) -> None:
+        results[index] = gatherer.parse(jobs[index])
+
+    threads = [threading.Thread(target=poll, args=(index,)) for index in range(len(jobs))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_group_pages_share_one_submission() -> None:
+    pool = RecordingPool()
+    gatherer = ParseGatherer(pool, 3, window=10)
+    jobs = [["a1", "a2"], [], ["c1"]]
+
+    results = run_accounts(gatherer, jobs)
+
+    assert len(pool.calls) == 1
+    assert sorted(pool.calls[0]) == ["a1", "a2", "c1"]
+    assert results == [["parsed a1", "parsed a2"], [], ["parsed c1"]]
+
+
+def test_missing_accounts_do_not_block_the_group() -> None:
+    pool = RecordingPool()
+    gatherer = ParseGatherer(pool, 3, window=0.05)
+
+    assert gatherer.parse(["a1"]) == ["parsed a1"]
+    assert gatherer.parse(["b1"]) == ["parsed b1"]
+    assert pool.calls == [["a1"], ["b1"]]
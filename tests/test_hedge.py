@@ -0,0 +1,94 @@
+"""Tests for hedged page reads in the hub."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import pytest
+from conftest import Delayed, ScriptedTransport
+
+from custom_components.postown_smartweb.const import HEDGE_MIN_SAMPLES
+from custom_components.postown_smartweb.hub import SmartWebHub
+from custom_components.postown_smartweb.latency import LatencyTracker
+from custom_components.postown_smartweb.transport import TransportError
+
+URL = "http://smartweb.invalid/SmartWeb/My_Home/Main.aspx"
+HEDGE_DELAY = 0.05
+
+
+@pytest.fixture
+def transport() -> ScriptedTransport:
+    return ScriptedTransport()
+
+
+@pytest.fixture
+def hub(transport: ScriptedTransport) -> Iterator[SmartWebHub]:
+    hub = SmartWebHub(
+        "http://smartweb.invalid", "user", "pass", transport=transport, hedge_reads=True
+    )
+    hub._latency = LatencyTracker()
+    for _ in range(HEDGE_MIN_SAMPLES):
+        hub._latency.record(HEDGE_DELAY)
+    yield hub
+    hub.close()
+
+
+def test_no_hedge_without_latency_history(transport: ScriptedTransport) -> None:
+    hub = SmartWebHub(
+        "http://smartweb.invalid", "user", "pass", transport=transport, hedge_reads=True
+    )
+    hub._latency = LatencyTracker()
+    transport.responses = [(200, "primary")]
+    assert hub._get_page(URL).text == "primary"
+    assert hub.hedged_reads == 0
+
+
+def test_fast_primary_is_not_hedged(hub: SmartWebHub, transport: ScriptedTransport) -> None:
+    transport.responses = [(200, "primary")]
+    assert hub._get_page(URL).text == "primary"
+    assert (hub.hedged_reads, hub.hedge_wins) == (0, 0)
+
+
+def test_fast_primary_error_is_raised(hub: SmartWebHub, transport: ScriptedTransport) -> None:
+    transport.responses = [TransportError("refused")]
+    with pytest.raises(TransportError, match="refused"):
+        hub._get_page(URL)
+    assert hub.hedged_reads == 0
+
+
+def test_hedge_wins_over_slow_primary(
+    hub: SmartWebHub, transport: ScriptedTransport
+) -> None:
+    transport.responses = [Delayed(0.5, (200, "primary")), (200, "hedge")]
+    assert hub._get_page(URL).text == "hedge"
+    assert (hub.hedged_reads, hub.hedge_wins) == (1, 1)
+
+
+def test_primary_can_still_win_after_hedging(
+    hub: SmartWebHub, transport: ScriptedTransport
+) -> None:
+    transport.responses = [Delayed(0.1, (200, "primary")), Delayed(0.5, (200, "hedge"))]
+    assert hub._get_page(URL).text == "primary"
+    assert (hub.hedged_reads, hub.hedge_wins) == (1, 0)
+
+
+def test_hedge_wins_after_primary_fails(
+    hub: SmartWebHub, transport: ScriptedTransport
+) -> None:
+    transport.responses = [
+        Delayed(0.1, TransportError("reset")),
+        Delayed(0.2, (200, "hedge")),
+    ]
+    assert hub._get_page(URL).text == "hedge"
+    assert (hub.hedged_reads, hub.hedge_wins) == (1, 1)
+
+
+def test_error_is_raised_when_both_fail(
+    hub: SmartWebHub, transport: ScriptedTransport
+) -> None:
+    transport.responses = [
+        Delayed(0.1, TransportError("primary timed out")),
+        Delayed(0.2, TransportError("hedge timed out")),
+    ]
+    with pytest.raises(TransportError, match="hedge timed out"):
+        hub._get_page(URL)
+    assert (hub.hedged_reads, hub.hedge_wins) == (1, 0)
@@ -0,0 +1,66 @@
+"""Tests for latency-derived timeouts."""
+from __future__ import annotations
+
+from custom_components.postown_smartweb.const import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    HEDGE_MIN_SAMPLES,
+)
+from custom_components.postown_smartweb.latency import (
+    MAX_CONNECT_TIMEOUT,
+    MAX_READ_TIMEOUT,
+    MAX_SLOW_READ_TIMEOUT,
+    MIN_CONNECT_TIMEOUT,
+    MIN_READ_TIMEOUT,
+    MIN_SLOW_READ_TIMEOUT,
+    LatencyTracker,
+)
+
+
+def tracker_with(*samples: float) -> LatencyTracker:
+    tracker = LatencyTracker()
+    for sample in samples:
+        tracker.record(sample)
+    return tracker
+
+
+def test_defaults_without_samples() -> None:
+    tracker = LatencyTracker()
+    assert tracker.timeout() == (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+    assert tracker.timeout(slow=True) == (DEFAULT_CONNECT_TIMEOUT, 2 * DEFAULT_READ_TIMEOUT)
+
+
+def test_fast_server_gets_the_minimum_timeouts() -> None:
+    tracker = tracker_with(*[0.01] * 10)
+    assert tracker.timeout() == (MIN_CONNECT_TIMEOUT, MIN_READ_TIMEOUT)
+    assert tracker.timeout(slow=True) == (MIN_CONNECT_TIMEOUT, MIN_SLOW_READ_TIMEOUT)
+
+
+def test_slow_server_gets_the_maximum_timeouts() -> None:
+    tracker = tracker_with(*[20.0] * 10)
+    assert tracker.timeout() == (MAX_CONNECT_TIMEOUT, MAX_READ_TIMEOUT)
+    assert tracker.timeout(slow=True) == (MAX_CONNECT_TIMEOUT, MAX_SLOW_READ_TIMEOUT)
+
+
+def test_timeouts_follow_the_latency_between_the_bounds() -> None:
+    tracker = tracker_with(*[1.0] * 19, 1.5)
+    connect, read = tracker.timeout()
+    assert connect == 3.0
+    assert read == 6.0
+    assert tracker.timeout(slow=True)[1] == 12.0
+
+
+def test_window_drops_old_samples() -> None:
+    tracker = LatencyTracker(window=5)
+    for _ in range(5):
+        tracker.record(20.0)
+    for _ in range(5):
+        tracker.record(0.01)
+    assert tracker.timeout() == (MIN_CONNECT_TIMEOUT, MIN_READ_TIMEOUT)
+
+
+def test_hedge_delay_needs_enough_samples() -> None:
+    tracker = tracker_with(*[0.2] * (HEDGE_MIN_SAMPLES - 1))
+    assert tracker.hedge_delay() is None
+    tracker.record(0.2)
+    assert tracker.hedge_delay() == 0.2
@@ -0,0 +1,77 @@
+"""Tests for the command outbox."""
+from __future__ import annotations
+
+import time
+
+from custom_components.postown_smartweb.const import (
+    OUTBOX_RETRY_MAX,
+    OUTBOX_RETRY_MIN,
+)
+from custom_components.postown_smartweb.outbox import CommandOutbox
+
+HEATER = ("heater", "31")
+
+
+def test_commands_for_a_device_are_merged() -> None:
+    outbox = CommandOutbox()
+    outbox.put(*HEATER, {"hvac_mode": "heat", "preset_mode": "away"})
+    outbox.put(*HEATER, {"target_temperature": 27})
+    outbox.put(*HEATER, {"target_temperature": 22})
+    outbox.put("light", "1", {"is_on": True})
+
+    assert len(outbox) == 2
+    assert outbox.pending(HEATER) == {
+        "hvac_mode": "heat",
+        "preset_mode": "away",
+        "target_temperature": 22,
+    }
+
+
+def test_completing_a_replaced_command_keeps_the_newer_one() -> None:
+    outbox = CommandOutbox()
+    outbox.put(*HEATER, {"target_temperature": 27})
+    [(key, desired, seq)] = outbox.due(0.0)
+    assert desired == {"target_temperature": 27}
+
+    # A newer command arrives while the first one is being sent.
+    outbox.put(*HEATER, {"target_temperature": 22})
+    outbox.complete(key, seq)
+    assert outbox.pending(HEATER) == {"target_temperature": 22}
+
+    [(key, desired, seq)] = outbox.due(0.0)
+    outbox.complete(key, seq)
+    assert len(outbox) == 0
+
+
+def test_failed_commands_back_off() -> None:
+    outbox = CommandOutbox()
+    outbox.put(*HEATER, {"target_temperature": 22})
+    [(key, _, seq)] = outbox.due(0.0)
+
+    assert outbox.retry_later(key, seq, 100.0) == OUTBOX_RETRY_MIN
+    assert outbox.due(100.0) == []
+    assert outbox.next_due() == 100.0 + OUTBOX_RETRY_MIN
+    assert outbox.retry_later(key, seq, 100.0) == 2 * OUTBOX_RETRY_MIN
+    for _ in range(20):
+        delay = outbox.retry_later(key, seq, 100.0)
+    assert delay == OUTBOX_RETRY_MAX
+
+
+def test_new_command_resets_the_backoff() -> None:
+    outbox = CommandOutbox()
+    outbox.put(*HEATER, {"target_temperature": 22})
+    [(key, _, seq)] = outbox.due(0.0)
+    outbox.retry_later(key, seq, 100.0)
+
+    outbox.put(*HEATER, {"target_temperature": 23})
+    assert outbox.retry_later(key, seq, 100.0) == 0.0
+    assert [desired for _, desired, _ in outbox.due(100.0)] == [
+        {"target_temperature": 23}
+    ]
+
+
+def test_expired_commands_are_dropped() -> None:
+    outbox = CommandOutbox(max_age=60)
+    outbox.put(*HEATER, {"target_temperature": 22})
+    assert outbox.due(time.time() + 61) == []
+    assert len(outbox) == 0
@@ -0,0 +1,81 @@
+"""Tests for the page helpers."""
+from __future__ import annotations
+
+import pytest
+from conftest import delta
+
+from custom_components.postown_smartweb.pages import (
+    BUTTON_AWAY,
+    BUTTON_OFF,
+    BUTTON_ON,
+    BUTTON_SET_TEMPERATURE,
+    HVAC_HEAT,
+    HVAC_OFF,
+    PRESET_AWAY,
+    PRESET_HOME,
+    panel_complete,
+    parse_delta,
+    plan_heater,
+)
+
+LIGHT_PANEL = '<img src="/images/icon_b_light_on.png">'
+
+
+def test_parse_delta() -> None:
+    entries = [
+        ("updatePanel", "UpdatePanel1", LIGHT_PANEL),
+        ("hiddenField", "__VIEWSTATE", "abc|def"),
+        ("asyncPostBackControlIDs", "", ""),
+    ]
+    assert parse_delta(delta(*entries)) == entries
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "<!DOCTYPE html><html><body></body></html>",
+        "10|updatePanel|UpdatePanel1|short|",
+        "5|updatePanel|UpdatePanel1|short",
+        "x|updatePanel|UpdatePanel1||",
+    ],
+)
+def test_parse_delta_rejects_other_bodies(text: str) -> None:
+    assert parse_delta(text) is None
+
+
+def test_panel_complete() -> None:
+    assert panel_complete("light", LIGHT_PANEL)
+    assert not panel_complete("light", "<div></div>")
+    assert not panel_complete("heater", '<img src="icon_b_boiler_on.png">')
+    assert panel_complete(
+        "heater", '<img src="icon_b_boiler_on.png"><input id="txtboxSetTemp">'
+    )
+
+
+OFF = {"hvac_mode": HVAC_OFF, "preset_mode": PRESET_HOME, "target_temperature": 20}
+HOME = {"hvac_mode": HVAC_HEAT, "preset_mode": PRESET_HOME, "target_temperature": 20}
+AWAY = {"hvac_mode": HVAC_HEAT, "preset_mode": PRESET_AWAY, "target_temperature": 20}
+
+
+@pytest.mark.parametrize(
+    ("current", "desired", "buttons"),
+    [
+        (OFF, {"hvac_mode": HVAC_HEAT, "preset_mode": PRESET_HOME}, [BUTTON_ON]),
+        (HOME, {"hvac_mode": HVAC_HEAT, "preset_mode": PRESET_HOME}, []),
+        (AWAY, {"hvac_mode": HVAC_HEAT, "preset_mode": PRESET_HOME}, [BUTTON_ON]),
+        (OFF, {"hvac_mode": HVAC_HEAT, "preset_mode": PRESET_AWAY}, [BUTTON_AWAY]),
+        (HOME, {"hvac_mode": HVAC_HEAT, "preset_mode": PRESET_AWAY}, [BUTTON_AWAY]),
+        (AWAY, {"hvac_mode": HVAC_HEAT, "preset_mode": PRESET_AWAY}, []),
+        (HOME, {"hvac_mode": HVAC_OFF, "preset_mode": None}, [BUTTON_OFF]),
+        (OFF, {"hvac_mode": HVAC_OFF, "preset_mode": None}, []),
+        (HOME, {"target_temperature": 24}, [BUTTON_SET_TEMPERATURE]),
+        (HOME, {"target_temperature": 20.4}, []),
+        (
+            OFF,
+            {"hvac_mode": HVAC_HEAT, "preset_mode": PRESET_AWAY, "target_temperature": 24},
+            [BUTTON_AWAY, BUTTON_SET_TEMPERATURE],
+        ),
+    ],
+)
+def test_plan_heater(current: dict, desired: dict, buttons: list[str]) -> None:
+    assert plan_heater(current, desired) == buttons
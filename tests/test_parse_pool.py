@@ -0,0 +1,23 @@
+"""Tests for splitting parse jobs into batches."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.postown_smartweb.parse_pool import ParsePool
+
+
+@pytest.mark.parametrize(
+    ("count", "sizes"),
+    [
+        (0, []),
+        (5, [5]),
+        (32, [32]),
+        (40, [20, 20]),
+        (75, [25, 25, 25]),
+        (100, [25, 25, 25, 25]),
+    ],
+)
+def test_batches_are_full_and_balanced(count: int, sizes: list[int]) -> None:
+    pool = ParsePool(workers=2, batch_size=32)
+    jobs = [("light", b"", "utf-8")] * count
+    assert [len(batch) for batch in pool.batches(jobs)] == sizes
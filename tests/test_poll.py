@@ -0,0 +1,167 @@
+"""Tests for the panel poll fallback in the hub."""
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from conftest import Clock, ScriptedTransport, delta
+
+from custom_components.postown_smartweb.const import (
+    DELTA_MAX_FAILURES,
+    DELTA_RETRY_INTERVAL,
+    DELTA_VERIFY_INTERVAL,
+    POLL_MODE_AUTO,
+)
+from custom_components.postown_smartweb.hub import SmartWebHub
+from custom_components.postown_smartweb.pages import device_url
+from custom_components.postown_smartweb.transport import TransportError
+
+HOST = "http://smartweb.invalid"
+URL = device_url(HOST, "light", "1")
+PANEL = '<img src="/images/icon_b_light_on.png">'
+PAGE = f'<html><body><div id="UpdatePanel1">{PANEL}</div></body></html>'
+
+
+@pytest.fixture
+def transport() -> ScriptedTransport:
+    return ScriptedTransport()
+
+
+@pytest.fixture
+def hub(clock: Clock, transport: ScriptedTransport) -> SmartWebHub:
+    hub = SmartWebHub(HOST, "user", "pass", poll_mode=POLL_MODE_AUTO, transport=transport)
+    hub._logged_in = True
+    hub._forms[URL] = {"__VIEWSTATE": "state"}
+    return hub
+
+
+def test_usable_panel_is_returned(hub: SmartWebHub, transport: ScriptedTransport) -> None:
+    transport.responses = [
+        (200, delta(("updatePanel", "UpdatePanel1", PANEL), ("hiddenField", "__VIEWSTATE", "next"))),
+    ]
+    assert hub._fetch_panel("light", URL) == PANEL
+    assert hub._forms[URL]["__VIEWSTATE"] == "next"
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        (500, "Server Error"),
+        (200, delta(("error", "500", "Object reference not set"))),
+        TransportError("timed out"),
+    ],
+)
+def test_transient_failures_keep_delta(
+    hub: SmartWebHub, transport: ScriptedTransport, response: Any
+) -> None:
+    transport.responses = [response] * (DELTA_MAX_FAILURES + 1)
+    for _ in range(DELTA_MAX_FAILURES + 1):
+        assert hub._fetch_panel("light", URL) is None
+    assert hub._use_delta()
+
+
+def test_full_page_reply_disables_delta_for_a_while(
+    hub: SmartWebHub, transport: ScriptedTransport, clock: Clock
+) -> None:
+    transport.responses = [(200, PAGE)]
+    assert hub._fetch_panel("light", URL) is None
+    assert not hub._use_delta()
+
+    clock.now += DELTA_RETRY_INTERVAL
+    assert hub._use_delta()
+
+
+def test_repeated_deltas_without_panel_disable_delta(
+    hub: SmartWebHub, transport: ScriptedTransport
+) -> None:
+    empty = (200, delta(("hiddenField", "__VIEWSTATE", "next")))
+    transport.responses = [empty] * DELTA_MAX_FAILURES
+    for _ in range(DELTA_MAX_FAILURES - 1):
+        assert hub._fetch_panel("light", URL) is None
+        assert hub._use_delta()
+    assert hub._fetch_panel("light", URL) is None
+    assert not hub._use_delta()
+
+
+def test_usable_panel_resets_the_failure_count(
+    hub: SmartWebHub, transport: ScriptedTransport
+) -> None:
+    empty = (200, delta(("hiddenField", "__VIEWSTATE", "next")))
+    good = (200, delta(("updatePanel", "UpdatePanel1", PANEL)))
+    transport.responses = [empty] * (DELTA_MAX_FAILURES - 1) + [good] + [empty]
+    for _ in range(DELTA_MAX_FAILURES + 1):
+        hub._fetch_panel("light", URL)
+    assert hub._use_delta()
+
+
+LIGHT_OFF_PAGE = PAGE.replace("icon_b_light_on", "icon_b_light_off")
+
+
+def test_panel_polls_are_checked_against_the_page(
+    hub: SmartWebHub, transport: ScriptedTransport, clock: Clock
+) -> None:
+    hub._page_loaded[URL] = clock.now
+    good = (200, delta(("updatePanel", "UpdatePanel1", PANEL)))
+    transport.responses = [good, good, (200, PAGE)]
+
+    assert hub._read_state("light", URL) == {"is_on": True}
+    clock.now += DELTA_VERIFY_INTERVAL
+    assert hub._read_state("light", URL) == {"is_on": True}
+    assert transport.responses == []
+    assert hub._use_delta()
+    assert hub._page_loaded[URL] == clock.now
+
+
+def test_frozen_panel_disables_delta(
+    hub: SmartWebHub, transport: ScriptedTransport, clock: Clock
+) -> None:
+    # The panel is re-rendered from viewstate while the light was switched off.
+    good = (200, delta(("updatePanel", "UpdatePanel1", PANEL)))
+    transport.responses = [good, (200, LIGHT_OFF_PAGE)]
+
+    assert hub._read_state("light", URL) == {"is_on": False}
+    assert not hub._use_delta()
+
+
+def test_frozen_panel_disables_delta_in_batched_polls(
+    hub: SmartWebHub, transport: ScriptedTransport
+) -> None:
+    good = (200, delta(("updatePanel", "UpdatePanel1", PANEL)))
+    transport.responses = [good, (200, LIGHT_OFF_PAGE)]
+
+    states, pages = hub.fetch_pages([("light", "1")])
+    assert states == {("light", "1"): {"is_on": True}}
+    assert [key for key, _ in pages] == [("light", "1")]
+    hub.store_pages([(("light", "1"), ({"is_on": False}, None))])
+    assert not hub._use_delta()
+
+
+def test_batched_page_older_than_a_command_is_not_stored(
+    hub: SmartWebHub, transport: ScriptedTransport
+) -> None:
+    hub._delta_off_until = float("inf")
+    transport.responses = [(200, LIGHT_OFF_PAGE)]
+    states, _ = hub.fetch_pages([("light", "1")])
+    assert states == {}
+
+    # A command turns the light on while the page is being parsed.
+    hub._forms[URL] = {"__VIEWSTATE": "after command"}
+    hub.cache.set(("light", "1"), {"is_on": True})
+
+    stored = hub.store_pages([(("light", "1"), ({"is_on": False}, {"__VIEWSTATE": "old"}))])
+    assert stored == {("light", "1"): {"is_on": True}}
+    assert hub._forms[URL] == {"__VIEWSTATE": "after command"}
+    assert hub.cache.get(("light", "1")).state == {"is_on": True}
+
+
+def test_batched_page_keeps_fields_of_its_own_session(
+    hub: SmartWebHub, transport: ScriptedTransport
+) -> None:
+    hub._delta_off_until = float("inf")
+    transport.responses = [(200, LIGHT_OFF_PAGE)]
+    hub.fetch_pages([("light", "1")])
+
+    hub._generation += 1
+    stored = hub.store_pages([(("light", "1"), ({"is_on": False}, {"__VIEWSTATE": "old"}))])
+    assert stored == {("light", "1"): {"is_on": False}}
+    assert hub._forms[URL] == {"__VIEWSTATE": "state"}
@@ -0,0 +1,83 @@
+"""Tests for session lifetime learning in the hub."""
+from __future__ import annotations
+
+import pytest
+from conftest import Clock
+
+from custom_components.postown_smartweb.const import (
+    DEFAULT_SESSION_IDLE_TIMEOUT,
+    SESSION_LEARN_TTL,
+)
+from custom_components.postown_smartweb.hub import SmartWebHub
+from custom_components.postown_smartweb.transport import Transport
+
+
+@pytest.fixture
+def hub(clock: Clock) -> SmartWebHub:
+    return SmartWebHub("http://smartweb.invalid", "user", "pass", transport=Transport())
+
+
+def start_session(hub: SmartWebHub, clock: Clock) -> None:
+    """Pretend a login just succeeded."""
+    hub._logged_in = True
+    hub._generation += 1
+    hub._session_started = hub._last_activity = clock.now
+
+
+def expire_while_polling(hub: SmartWebHub, clock: Clock, age: float) -> None:
+    """Poll every 30 seconds until the session expires at ``age``."""
+    start_session(hub, clock)
+    end = clock.now + age
+    while clock.now + 30 < end:
+        clock.now += 30
+        hub._note_activity()
+    clock.now = end
+    hub._note_expiry(hub._generation)
+
+
+def test_single_expiry_is_not_adopted(hub: SmartWebHub, clock: Clock) -> None:
+    expire_while_polling(hub, clock, 300)
+    assert hub._absolute_lifetime is None
+
+
+def test_consistent_expiries_are_adopted(hub: SmartWebHub, clock: Clock) -> None:
+    expire_while_polling(hub, clock, 600)
+    expire_while_polling(hub, clock, 630)
+    assert hub._absolute_lifetime == 600
+
+
+def test_inconsistent_expiries_are_not_adopted(hub: SmartWebHub, clock: Clock) -> None:
+    expire_while_polling(hub, clock, 300)
+    expire_while_polling(hub, clock, 3000)
+    assert hub._absolute_lifetime is None
+
+
+def test_outliving_the_lifetime_drops_it(hub: SmartWebHub, clock: Clock) -> None:
+    expire_while_polling(hub, clock, 600)
+    expire_while_polling(hub, clock, 600)
+    start_session(hub, clock)
+    clock.now += 700
+    hub._note_activity()
+    assert hub._absolute_lifetime is None
+
+
+def test_idle_timeout_grows_back(hub: SmartWebHub, clock: Clock) -> None:
+    for _ in range(2):
+        start_session(hub, clock)
+        clock.now += 400
+        hub._note_expiry(hub._generation)
+    assert hub._idle_timeout == 400
+
+    start_session(hub, clock)
+    clock.now += 900
+    hub._note_activity()
+    assert hub._idle_timeout == 900
+
+
+def test_learned_lifetimes_are_forgotten(hub: SmartWebHub, clock: Clock) -> None:
+    expire_while_polling(hub, clock, 600)
+    expire_while_polling(hub, clock, 600)
+    clock.now += SESSION_LEARN_TTL
+    hub.keepalive()
+    assert hub._absolute_lifetime is None
+    assert hub._idle_timeout == DEFAULT_SESSION_IDLE_TIMEOUT
@@ -0,0 +1,77 @@
+"""Tests for recording and replaying sessions."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from urllib.parse import parse_qsl
+
+from conftest import ScriptedTransport, delta
+
+from custom_components.postown_smartweb.hub import SmartWebHub
+from custom_components.postown_smartweb.pages import (
+    BUTTON_OFF,
+    device_url,
+    panel_payload,
+    postback_payload,
+)
+from custom_components.postown_smartweb.transport import (
+    REDACTED,
+    RecordingTransport,
+    ReplayTransport,
+)
+
+HOST = "http://smartweb.invalid"
+URL = device_url(HOST, "light", "1")
+USERNAME = "alice"
+PASSWORD = "hunter2"
+TOKEN = "login-token-1234"
+FIELDS = {"__VIEWSTATE": "state"}
+LOGIN_PAGE = '<input type="hidden" id="__VIEWSTATE" name="__VIEWSTATE" value="login">'
+LIGHT_ON = delta(("updatePanel", "UpdatePanel1", '<img src="icon_b_light_on.png">'))
+LIGHT_OFF = delta(("updatePanel", "UpdatePanel1", '<img src="icon_b_light_off.png">'))
+
+
+def record(path: Path) -> None:
+    """Log in, poll a light and switch it off through a recorder."""
+    inner = ScriptedTransport()
+    inner.responses = [
+        (200, LOGIN_PAGE),
+        (200, json.dumps({"d": TOKEN})),
+        (200, delta(("pageRedirect", "", "/SmartWeb/My_Home/Main.aspx"))),
+        (200, LIGHT_ON),
+        (200, LIGHT_OFF),
+    ]
+    recorder = RecordingTransport(inner)
+    hub = SmartWebHub(HOST, USERNAME, PASSWORD, transport=recorder)
+    assert hub.login()
+    recorder.request("POST", URL, data=panel_payload(FIELDS))
+    recorder.request("POST", URL, data=postback_payload(FIELDS, BUTTON_OFF))
+    recorder.save(str(path))
+
+
+def test_credentials_and_token_are_redacted(tmp_path: Path) -> None:
+    path = tmp_path / "cassette.json"
+    record(path)
+
+    text = path.read_text(encoding="utf-8")
+    for secret in (USERNAME, PASSWORD, TOKEN):
+        assert secret not in text
+
+    _, service, login, *_ = json.loads(text)["interactions"]
+    assert service["request"]["json"] == {"ID": REDACTED, "PW": REDACTED}
+    assert json.loads(service["response"]["text"]) == {"d": REDACTED}
+    form = dict(parse_qsl(login["request"]["data"]))
+    for field in ("txtID", "txtPW", "Hidden1"):
+        assert form[field] == REDACTED
+
+
+def test_replay_matches_postbacks_on_their_target(tmp_path: Path) -> None:
+    path = tmp_path / "cassette.json"
+    record(path)
+    replay = ReplayTransport(str(path), time_scale=0)
+
+    # Asked in the opposite order from the recording.
+    button = replay.request("POST", URL, data=postback_payload(FIELDS, BUTTON_OFF))
+    panel = replay.request("POST", URL, data=panel_payload(FIELDS))
+    assert (button.status_code, button.text) == (200, LIGHT_OFF)
+    assert (panel.status_code, panel.text) == (200, LIGHT_ON)